@@ -0,0 +1,12 @@
+"""
+benchmarks
+~~~~~~~~~~
+Benchmarks of the hot paths of entitas. The suite runs the scenarios
+of benchmarks.scenarios, reports operations per second and peak
+memory, and saves them as JSON. Run it from the repository root:
+
+    python -m benchmarks --output baseline.json
+    python -m benchmarks --compare baseline.json
+
+The bench_* modules are standalone comparisons of past designs.
+"""
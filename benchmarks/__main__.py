@@ -0,0 +1,124 @@
+"""
+Runs the benchmark suite:
+
+    python -m benchmarks [--size N] [--output results.json]
+                         [--compare baseline.json] [--threshold 0.1]
+                         [scenario ...]
+
+With --compare, the command fails when a scenario is slower, or uses
+more memory, than the baseline by more than the threshold.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import tracemalloc
+from time import perf_counter
+
+from .scenarios import SCENARIOS
+
+
+def measure(function, size, repeat):
+    """Returns the best operations per second over some runs, and the
+    peak memory of the setup and of one run.
+    """
+    gc.collect()
+    tracemalloc.start()
+    run, ops = function(size)
+    run()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    run, ops = function(size)
+    run()
+    best = float('inf')
+    for _ in range(repeat):
+        start = perf_counter()
+        run()
+        best = min(best, perf_counter() - start)
+
+    return {'ops': ops, 'ops_per_sec': ops / best,
+            'peak_memory': peak_memory}
+
+
+def run_suite(names, size, repeat):
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'size': size,
+        'scenarios': {name: measure(SCENARIOS[name], size, repeat)
+                      for name in names},
+    }
+
+
+def compare(results, baseline, threshold):
+    """Returns the regressions of the results against the baseline.
+    :rtype: list of str
+    """
+    regressions = []
+    for name, stats in results['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+
+        speed = stats['ops_per_sec'] / base['ops_per_sec']
+        memory = stats['peak_memory'] / max(base['peak_memory'], 1)
+        if speed < 1 - threshold:
+            regressions.append('{}: {:.0%} slower'.format(name, 1 - speed))
+        if memory > 1 + threshold:
+            regressions.append('{}: {:.0%} more memory'.format(
+                name, memory - 1))
+
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('scenarios', nargs='*',
+                        help='scenarios to run, all by default: {}'.format(
+                            ', '.join(SCENARIOS)))
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='JSON file to save results to')
+    parser.add_argument('--compare', help='JSON file of a baseline')
+    parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args(args)
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error('unknown scenarios: {}'.format(', '.join(unknown)))
+
+    results = run_suite(args.scenarios or list(SCENARIOS), args.size,
+                        args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print('{:<20} {:>14} {:>12} {:>10}'.format(
+        'scenario', 'ops/sec', 'peak KiB', 'baseline'))
+    for name, stats in results['scenarios'].items():
+        base = baseline and baseline['scenarios'].get(name)
+        print('{:<20} {:>14,.0f} {:>12,.0f} {:>10}'.format(
+            name, stats['ops_per_sec'], stats['peak_memory'] / 1024,
+            '{:.2f}x'.format(stats['ops_per_sec'] / base['ops_per_sec'])
+            if base else '-'))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+benchmarks.bench_entity_memory
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Measures the memory used per entity with tracemalloc. The eager
+context creates entities with an instance dictionary and their three
+events allocated up front, like entities used to be.
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_entity_memory
+"""
+
+import tracemalloc
+from collections import namedtuple
+
+from entitas import Context, Entity
+
+Position = namedtuple('Position', 'x y')
+
+
+class EagerEntity(Entity):
+    """Has an instance dictionary and allocates its events."""
+
+    def __init__(self):
+        super().__init__()
+        self.on_component_added
+        self.on_component_removed
+        self.on_component_replaced
+
+
+class EagerContext(Context):
+
+    def _new_entity(self):
+        return EagerEntity()
+
+
+def bytes_per_entity(context_class, entity_count):
+    tracemalloc.start()
+    context = context_class()
+    before = tracemalloc.get_traced_memory()[0]
+
+    for _ in range(entity_count):
+        context.create_entity().add(Position, 0, 0)
+
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / entity_count
+
+
+def main(entity_count=100000):
+    eager = bytes_per_entity(EagerContext, entity_count)
+    lazy = bytes_per_entity(Context, entity_count)
+    print('{:<10} {:>8.0f} bytes/entity'.format('eager', eager))
+    print('{:<10} {:>8.0f} bytes/entity'.format('slotted', lazy))
+    print('{:<10} {:>8.0f}%'.format('saving', 100 * (1 - lazy / eager)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+benchmarks.bench_events
+~~~~~~~~~~~~~~~~~~~~~~~
+Measures the cost of dispatching events, alone and on the component
+add/replace hot path. The list event is the implementation Event used
+to have, kept here for comparison.
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_events
+"""
+
+from collections import namedtuple
+from timeit import timeit
+
+from entitas import Context, Event, Matcher
+
+Position = namedtuple('Position', 'x y')
+
+
+class ListEvent(object):
+    """Keeps listeners in a list and forwards keyword arguments."""
+
+    def __init__(self):
+        self._listeners = []
+
+    def __call__(self, *args, **kwargs):
+        for listener in self._listeners:
+            listener(*args, **kwargs)
+
+    def __add__(self, listener):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+        return self
+
+    def __sub__(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+        return self
+
+
+def listener(entity, comp):
+    pass
+
+
+def bench_dispatch(event_class, listener_count, number):
+    event = event_class()
+    for _ in range(listener_count):
+        event += lambda entity, comp: None
+    return timeit(lambda: event(None, None), number=number)
+
+
+def bench_subscribe(event_class, listener_count, number):
+    listeners = [lambda: None for _ in range(listener_count)]
+
+    def subscribe():
+        event = event_class()
+        for listener in listeners:
+            event += listener
+        for listener in listeners:
+            event -= listener
+
+    return timeit(subscribe, number=number)
+
+
+def bench_hot_path(number):
+    context = Context()
+    context.get_group(Matcher(Position)).on_entity_added += listener
+    entity = context.create_entity()
+
+    def add_replace_remove():
+        entity.add(Position, 0, 0)
+        entity.replace(Position, 1, 1)
+        entity.remove(Position)
+
+    return timeit(add_replace_remove, number=number)
+
+
+def main(number=200000):
+    print('{:<28} {:>10} {:>10}'.format('dispatch', 'list', 'event'))
+    for listener_count in (0, 1, 3):
+        print('{:<28} {:>9.3f}s {:>9.3f}s'.format(
+            '{} listener(s)'.format(listener_count),
+            bench_dispatch(ListEvent, listener_count, number),
+            bench_dispatch(Event, listener_count, number)))
+
+    print('{:<28} {:>9.3f}s {:>9.3f}s'.format(
+        'subscribe 50 listeners',
+        bench_subscribe(ListEvent, 50, number // 100),
+        bench_subscribe(Event, 50, number // 100)))
+
+    print('{:<28} {:>9.3f}s'.format(
+        'add/replace/remove', bench_hot_path(number)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+benchmarks.bench_group_routing
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Measures the cost of component changes as the number of groups
+registered in a context grows. The routed context only notifies the
+groups whose matcher mentions the changed component type; the
+broadcast context notifies every group, like the context used to.
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_group_routing
+"""
+
+from collections import namedtuple
+from timeit import default_timer
+
+from entitas import Context, Matcher
+
+Position = namedtuple('Position', 'x y')
+
+
+class BroadcastContext(Context):
+    """Notifies every group for every component change."""
+
+    def _comp_added(self, entity, comp):
+        for matcher in self._groups:
+            self._groups[matcher].handle_entity(entity, comp)
+
+    _comp_removed = _comp_added
+
+    def _comp_replaced(self, entity, previous_comp, new_comp):
+        for matcher in self._groups:
+            self._groups[matcher].update_entity(
+                entity, previous_comp, new_comp)
+
+
+def make_unrelated_types(count):
+    return [namedtuple('Comp{}'.format(i), 'value') for i in range(count)]
+
+
+def run(context_class, group_count, entity_count, repeat):
+    context = context_class()
+    context.get_group(Matcher(Position))
+    for comp_type in make_unrelated_types(group_count - 1):
+        context.get_group(Matcher(comp_type))
+
+    entities = [context.create_entity() for _ in range(entity_count)]
+
+    start = default_timer()
+    for _ in range(repeat):
+        for entity in entities:
+            entity.add(Position, 0, 0)
+        for entity in entities:
+            entity.replace(Position, 1, 1)
+        for entity in entities:
+            entity.remove(Position)
+    return default_timer() - start
+
+
+def main(group_counts=(1, 10, 50, 200), entity_count=1000, repeat=10):
+    print('{:>8} {:>12} {:>12} {:>8}'.format(
+        'groups', 'broadcast', 'routed', 'speedup'))
+    for group_count in group_counts:
+        broadcast = run(BroadcastContext, group_count, entity_count, repeat)
+        routed = run(Context, group_count, entity_count, repeat)
+        print('{:>8} {:>11.3f}s {:>11.3f}s {:>7.1f}x'.format(
+            group_count, broadcast, routed, broadcast / routed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+benchmarks.bench_spatial_index
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Measures neighbourhood queries on a Position group with a spatial
+grid, a k-d tree and a scan of the whole group. Entities are spread
+uniformly so that each query finds about ten neighbours.
+
+Run it from the repository root, optionally with entity counts:
+
+    python -m benchmarks.bench_spatial_index 10000 100000 1000000
+"""
+
+import random
+import sys
+from collections import namedtuple
+from math import sqrt
+from timeit import default_timer
+
+from entitas import Context, Matcher, SpatialEntityIndex, KDTreeEntityIndex
+
+Position = namedtuple('Position', 'x y')
+
+RADIUS = 1.0
+NEIGHBOURS = 10
+
+
+def scan(group, center, radius):
+    square_radius = radius * radius
+    result = []
+    for entity in group.entities:
+        x, y = entity.get(Position)
+        if (x - center[0]) ** 2 + (y - center[1]) ** 2 <= square_radius:
+            result.append(entity)
+    return result
+
+
+def timed(func, *args):
+    start = default_timer()
+    result = func(*args)
+    return default_timer() - start, result
+
+
+def run(entity_count, query_count, scan_query_count):
+    rng = random.Random(entity_count)
+    side = sqrt(entity_count * 3.14159 * RADIUS * RADIUS / NEIGHBOURS)
+
+    context = Context()
+    group = context.get_group(Matcher(Position))
+    for _ in range(entity_count):
+        context.create_entity().add(
+            Position, rng.uniform(0, side), rng.uniform(0, side))
+
+    centers = [(rng.uniform(0, side), rng.uniform(0, side))
+               for _ in range(query_count)]
+
+    build, grid = timed(lambda: SpatialEntityIndex(
+        Position, group, 'x', 'y', cell_size=RADIUS))
+    grid_time, _ = timed(
+        lambda: [grid.query_radius(center, RADIUS) for center in centers])
+
+    tree = KDTreeEntityIndex(Position, group, 'x', 'y')
+    tree_build, _ = timed(tree.query_box, (0, 0), (0, 0))
+    tree_time, _ = timed(
+        lambda: [tree.query_radius(center, RADIUS) for center in centers])
+
+    scan_time, _ = timed(
+        lambda: [scan(group, center, RADIUS)
+                 for center in centers[:scan_query_count]])
+
+    return {
+        'grid build': build,
+        'grid query': grid_time / query_count,
+        'k-d tree build': tree_build,
+        'k-d tree query': tree_time / query_count,
+        'scan query': scan_time / scan_query_count,
+    }
+
+
+def main(entity_counts=(10000, 100000, 1000000)):
+    for entity_count in entity_counts:
+        results = run(entity_count, query_count=1000, scan_query_count=3)
+        print('{} entities'.format(entity_count))
+        for name, seconds in results.items():
+            print('  {:<16} {:>12.6f}s'.format(name, seconds))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main([int(arg) for arg in sys.argv[1:]])
+    else:
+        main()
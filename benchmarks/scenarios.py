@@ -0,0 +1,159 @@
+"""
+benchmarks.scenarios
+~~~~~~~~~~~~~~~~~~~~
+Reproducible scenarios. A scenario function sets up its state and
+returns (run, ops): run() performs ops operations, and is called
+several times on the same state.
+"""
+
+from collections import namedtuple
+
+from entitas import (
+    Context, Matcher, GroupEvent, EntityIndex, Processors, ExecuteProcessor,
+    ReactiveProcessor
+)
+
+Position = namedtuple('Position', 'x y')
+Velocity = namedtuple('Velocity', 'dx dy')
+Health = namedtuple('Health', 'value')
+Team = namedtuple('Team', 'name')
+
+#: Dictionary of scenario names mapping their functions, in
+#: registration order.
+SCENARIOS = {}
+
+
+def scenario(function):
+    SCENARIOS[function.__name__] = function
+    return function
+
+
+@scenario
+def entity_churn(size):
+    """Creates and destroys entities through the pool."""
+    context = Context()
+
+    def run():
+        entities = [context.create_entity() for _ in range(size)]
+        for entity in entities:
+            context.destroy_entity(entity)
+
+    return run, size * 2
+
+
+@scenario
+def component_changes(size, group_count=20):
+    """Adds, replaces and removes components with groups registered."""
+    context = Context()
+    comp_types = [Position, Velocity, Health, Team]
+    for i in range(group_count):
+        context.get_group(Matcher(all_of=[comp_types[i % 4]],
+                                  none_of=[comp_types[(i + 1) % 4]]))
+    entities = [context.create_entity() for _ in range(size)]
+
+    def run():
+        for entity in entities:
+            entity.add(Position, 0, 0)
+            entity.add(Velocity, 1, 1)
+            entity.replace(Position, 1, 1)
+            entity.remove(Velocity)
+            entity.remove(Position)
+
+    return run, size * 5
+
+
+class Heal(ReactiveProcessor):
+
+    def get_trigger(self):
+        return {Matcher(Health): GroupEvent.ADDED}
+
+    def filter(self, entity):
+        return entity.get(Health).value < 100
+
+    def react(self, entities):
+        for entity in entities:
+            entity.get(Health)
+
+
+@scenario
+def reactive_ticks(size):
+    """Collects replaced components, then reacts to them."""
+    context = Context()
+    processor = Heal(context)
+    processor.activate()
+    entities = [context.create_entity() for _ in range(size)]
+    for entity in entities:
+        entity.add(Health, 0)
+
+    def run():
+        for entity in entities:
+            entity.replace(Health, 50)
+        processor.execute()
+
+    return run, size
+
+
+@scenario
+def entity_index(size, team_count=10):
+    """Moves entities between teams, then looks teams up."""
+    context = Context()
+    index = EntityIndex(Team, context.get_group(Matcher(Team)), 'name')
+    entities = [context.create_entity() for _ in range(size)]
+    for i, entity in enumerate(entities):
+        entity.add(Team, i % team_count)
+
+    def run():
+        for i, entity in enumerate(entities):
+            entity.replace(Team, (i + 1) % team_count)
+        for i in range(size):
+            index.get_entities(i % team_count)
+
+    return run, size * 2
+
+
+class Move(ExecuteProcessor):
+
+    def __init__(self, context):
+        self._group = context.get_group(Matcher(Position, Velocity))
+
+    def execute(self):
+        for entity in self._group.entities:
+            position = entity.get(Position)
+            velocity = entity.get(Velocity)
+            entity.replace(Position, position.x + velocity.dx,
+                           position.y + velocity.dy)
+
+
+class Damage(ExecuteProcessor):
+
+    def __init__(self, context):
+        self._group = context.get_group(Matcher(Health, Position))
+
+    def execute(self):
+        for entity in self._group.entities:
+            if entity.get(Position).x > 0:
+                entity.replace(Health, entity.get(Health).value - 1)
+
+
+@scenario
+def processors_frame(size):
+    """Runs a frame of execute and reactive processors."""
+    context = Context()
+    processors = Processors()
+    processors.add(Move(context))
+    processors.add(Damage(context))
+    processors.add(Heal(context))
+    processors.activate_reactive_processors()
+
+    for i in range(size):
+        entity = context.create_entity()
+        entity.add(Position, 0, 0)
+        entity.add(Health, 100)
+        if i % 2:
+            entity.add(Velocity, 1, 0)
+
+    def run():
+        processors.execute()
+        processors.cleanup()
+
+    return run, size
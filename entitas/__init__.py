@@ -1,12 +1,28 @@
 from .entity import Entity
-from .entity_index import PrimaryEntityIndex, EntityIndex
+from .component import MutableComponent, mutable_component
+from .entity_index import (
+    PrimaryEntityIndex, EntityIndex, RangeEntityIndex, SpatialEntityIndex,
+    KDTreeEntityIndex
+)
 from .context import Context
+from .archetype import Archetype, ArchetypeStorage
 from .matcher import Matcher
-from .group import Group, GroupEvent
-from .collector import Collector
+from .group import Group, GroupEvent, GroupCursor, GroupDelta
+from .collector import Collector, ChangeCollector, Change
+from .command_buffer import CommandBuffer
+from .snapshot import Snapshot, SnapshotWriter, load_snapshots
+try:
+    from .sharding import ShardedContext
+except ImportError:  # multiprocessing.shared_memory needs Python 3.8
+    pass
+from .profiler import Profiler
+from .journal import (
+    ChangeJournal, JournalReader, write_frame, read_frames, replay
+)
+from .columns import ComponentColumns
 from .processors import (
     Processors, InitializeProcessor, ExecuteProcessor, CleanupProcessor,
-    TearDownProcessor, ReactiveProcessor
+    TearDownProcessor, ReactiveProcessor, BatchReactiveProcessor
 )
 from .utils import Event
 from .exceptions import (
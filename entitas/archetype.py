@@ -0,0 +1,267 @@
+"""
+entitas.archetype
+~~~~~~~~~~~~~~~~~
+An optional storage backend for a context. Entities having exactly
+the same component types live in the same archetype: a table with one
+column per component field. Columns are lists, or arrays when a
+typecode is given for the component type, so processors can run over
+contiguous data instead of going through each entity.
+
+    storage = ArchetypeStorage({Position: 'd', Velocity: 'd'})
+    context = Context(storage)
+"""
+
+from array import array
+
+from .entity import Entity
+from .exceptions import MissingComponent
+from .component_registry import get_bit, get_mask
+
+
+def convert(column, value):
+    """Returns a value as a one-item sequence of the type of a column,
+    raising TypeError or OverflowError if a typed column rejects it.
+    """
+    if isinstance(column, array):
+        return array(column.typecode, (value,))
+    return (value,)
+
+
+class Archetype(object):
+    """A table of the entities having exactly the same component types.
+    Rows are kept packed: removing a row moves the last one in its place.
+    """
+
+    def __init__(self, signature, comp_types, typecodes):
+
+        #: Bits of the component types stored in the table.
+        self.signature = signature
+
+        #: Component types stored in the table.
+        self.comp_types = comp_types
+
+        #: Entities of the table, by row.
+        self.entities = []
+
+        #: Dictionary mapping component types and their field columns.
+        self.columns = {}
+
+        for comp_type in comp_types:
+            typecode = typecodes.get(comp_type)
+            self.columns[comp_type] = tuple(
+                [] if typecode is None else array(typecode)
+                for _ in comp_type._fields)
+
+    def get(self, comp_type, row):
+        """Builds the component of a row.
+        :param comp_type: namedtuple type
+        :param row: int
+        :rtype: namedtuple
+        """
+        return comp_type._make(
+            [column[row] for column in self.columns[comp_type]])
+
+    def set(self, comp_type, row, comp):
+        """Writes the fields of a component in a row.
+        :param comp_type: namedtuple type
+        :param row: int
+        :param comp: namedtuple
+        """
+        values = [convert(column, value)
+                  for column, value in zip(self.columns[comp_type], comp)]
+        for column, value in zip(self.columns[comp_type], values):
+            column[row] = value[0]
+
+    def append(self, entity, components):
+        """Adds a row at the end of the table.
+        :param entity: Entity
+        :param components: dictionary mapping component types and the
+            field values of the entity
+        :rtype: int
+        """
+        # The whole row is converted before any column grows, so that a
+        # value rejected by a typed column leaves the table unchanged.
+        row = [(column, convert(column, value))
+               for comp_type, columns in self.columns.items()
+               for column, value in zip(columns, components[comp_type])]
+        for column, value in row:
+            column.extend(value)
+
+        self.entities.append(entity)
+        return len(self.entities) - 1
+
+    def pop(self, row):
+        """Removes a row, moving the last row in its place.
+        :param row: int
+        """
+        last = len(self.entities) - 1
+
+        for columns in self.columns.values():
+            for column in columns:
+                if row != last:
+                    column[row] = column[last]
+                column.pop()
+
+        moved = self.entities.pop()
+        if row != last:
+            self.entities[row] = moved
+            moved._row = row
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __repr__(self):
+        return '<Archetype [{}] ({})>'.format(
+            ','.join(sorted([x.__name__ for x in self.comp_types])),
+            len(self.entities))
+
+
+class ArchetypeEntity(Entity):
+    """An entity whose components live in the archetypes of an
+    :class:`ArchetypeStorage`. It is created by the context.
+    """
+
+    __slots__ = ('_storage', '_archetype', '_row')
+
+    def __init__(self, storage):
+        super().__init__()
+
+        #: Storage owning the archetypes of the entity.
+        self._storage = storage
+
+        #: Table holding the components of the entity, None when the
+        #: entity has no component.
+        self._archetype = None
+
+        #: Row of the entity in its archetype.
+        self._row = 0
+
+    def _add(self, comp_type, args):
+        new_comp = comp_type._make(args)
+        self._move(self._signature | get_bit(comp_type), (new_comp,))
+        self._notify_added(new_comp)
+
+    def _replace(self, comp_type, args):
+        previous_comp = self._archetype.get(comp_type, self._row)
+        if args is None:
+            self._move(self._signature & ~get_bit(comp_type), (), comp_type)
+            self._notify_removed(previous_comp)
+        else:
+            new_comp = comp_type._make(args)
+            self._archetype.set(comp_type, self._row, new_comp)
+            self._notify_replaced(previous_comp, new_comp)
+
+    def _update(self, comp_type, fields):
+        """Components are rebuilt from the columns: mutable ones cannot
+        be changed in place.
+        """
+        comp = self._archetype.get(comp_type, self._row)
+        self._replace(comp_type, tuple(comp._replace(**fields)))
+
+    def _store(self, comp_type, comp):
+        self._archetype.set(comp_type, self._row, comp)
+
+    def _add_all_silently(self, comps, signature):
+        self._move(self._signature | signature, comps)
+
+    def _remove_all_silently(self):
+        if self._archetype is not None:
+            self._archetype.pop(self._row)
+        self._archetype = None
+        self._row = 0
+        self._signature = 0
+
+    def _move(self, signature, comps, removed_type=None):
+        """Moves the entity to the archetype of the signature, adding
+        some components and dropping a component type.
+        """
+        source, row = self._archetype, self._row
+        components = {}
+
+        if source is not None:
+            for comp_type, columns in source.columns.items():
+                components[comp_type] = [column[row] for column in columns]
+
+        for comp in comps:
+            components[type(comp)] = comp
+
+        # The entity only leaves its row once the target archetype has
+        # accepted its values: it keeps its components otherwise.
+        if signature:
+            comp_types = frozenset(components).difference((removed_type,))
+            target = self._storage.get_archetype(signature, comp_types)
+            self._row = target.append(self, components)
+            self._archetype = target
+        else:
+            self._archetype = None
+            self._row = 0
+
+        self._signature = signature
+
+        if source is not None:
+            source.pop(row)
+
+    def get(self, comp_type):
+        if not self.has(comp_type):
+            raise MissingComponent(
+                'Cannot get unexisting component {!r} from {}.'
+                .format(comp_type.__name__, self))
+
+        return self._archetype.get(comp_type, self._row)
+
+    def get_components(self):
+        if self._archetype is None:
+            return []
+
+        return [self._archetype.get(comp_type, self._row)
+                for comp_type in self._archetype.comp_types]
+
+    def has(self, *args):
+        mask = get_mask(args)
+        return self._signature & mask == mask
+
+
+class ArchetypeStorage(object):
+    """Stores the components of the entities of a context in archetypes.
+    Pass it to the context to enable this storage mode.
+    """
+
+    def __init__(self, typecodes=None):
+
+        #: Dictionary mapping component types and the array typecode
+        #: of their columns. Other component types use lists.
+        self._typecodes = typecodes or {}
+
+        #: Dictionary mapping signatures and archetypes.
+        self._archetypes = {}
+
+    @property
+    def archetypes(self):
+        return list(self._archetypes.values())
+
+    def get_archetype(self, signature, comp_types):
+        """Returns the archetype of a signature, creating it if needed.
+        :param signature: int
+        :param comp_types: frozenset of namedtuple types
+        :rtype: Archetype
+        """
+        archetype = self._archetypes.get(signature)
+        if archetype is None:
+            archetype = Archetype(signature, comp_types, self._typecodes)
+            self._archetypes[signature] = archetype
+        return archetype
+
+    def get_archetypes(self, matcher):
+        """Returns the non-empty archetypes whose entities match.
+        :param matcher: Matcher
+        :rtype: list
+        """
+        return [archetype for archetype in self._archetypes.values()
+                if archetype.entities and
+                matcher.matches_signature(archetype.signature)]
+
+    def create_entity(self):
+        return ArchetypeEntity(self)
+
+    def __repr__(self):
+        return '<ArchetypeStorage ({})>'.format(len(self._archetypes))
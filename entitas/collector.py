@@ -1,4 +1,12 @@
+from collections import namedtuple
+
 from .group import GroupEvent
+from .component import copy_component
+
+#: Change of an entity collected by a :class:`ChangeCollector`. The
+#: previous component is None if the entity joined the group, the new
+#: one is None if it left the group.
+Change = namedtuple('Change', 'entity previous_comp new_comp')
 
 
 class Collector(object):
@@ -15,33 +23,150 @@ class Collector(object):
         self._groups[group] = group_event
 
     def activate(self):
+        """Starts collecting. Replacing a component of an entity in the
+        group counts as an addition, not as a removal.
+        """
         for group in self._groups:
             group_event = self._groups[group]
 
-            added_event = group_event == GroupEvent.added
-            removed_event = group_event == GroupEvent.removed
-            added_or_removed_event = group_event == GroupEvent.added_or_removed
+            added_event = group_event == GroupEvent.ADDED
+            removed_event = group_event == GroupEvent.REMOVED
+            added_or_removed_event = group_event == GroupEvent.ADDED_OR_REMOVED
 
             if added_event or added_or_removed_event:
-                group.on_entity_added -= self._add_entity
-                group.on_entity_added += self._add_entity
+                group.on_entity_joined += self._add_entity
+                group.on_entity_updated += self._update_entity
 
             if removed_event or added_or_removed_event:
-                group.on_entity_removed -= self._add_entity
-                group.on_entity_removed += self._add_entity
+                group.on_entity_left += self._add_entity
 
     def deactivate(self):
         for group in self._groups:
-            group.on_entity_added -= self._add_entity
-            group.on_entity_removed -= self._add_entity
+            group.on_entity_joined -= self._add_entity
+            group.on_entity_updated -= self._update_entity
+            group.on_entity_left -= self._add_entity
 
         self.clear_collected_entities()
 
     def clear_collected_entities(self):
         self._collected_entities.clear()
 
-    def _add_entity(self, entity):  # , component
+    def _add_entity(self, entity, component):
+        self._collected_entities.add(entity)
+
+    def _update_entity(self, entity, previous_comp, new_comp):
         self._collected_entities.add(entity)
 
     def __repr__(self):
         return '<Collector [{}]'.format(', '.join(map(str, self._groups)))
+
+
+class ChangeCollector(object):
+    """Collects the entities of each group with, for each type of
+    component changed, the component they had before the first change
+    and the one they have after the last change. Collecting an entity
+    again only updates its new components.
+    """
+
+    def __init__(self):
+        self._groups = {}
+
+        #: Dictionary of matchers mapping the collected entities and
+        #: dictionaries of component types mapping their
+        #: [previous component, new component].
+        self._changes = {}
+
+        #: Dictionary of matchers mapping the collected entities which
+        #: were not in the group before they got collected.
+        self._joined = {}
+
+        #: Dictionary of groups mapping their listeners.
+        self._listeners = {}
+
+    @property
+    def changes(self):
+        return self._changes
+
+    @property
+    def collected_entities(self):
+        entities = set()
+        for entity_changes in self._changes.values():
+            entities.update(entity_changes)
+        return entities
+
+    def add(self, group, group_event):
+        self._groups[group] = group_event
+
+    def activate(self):
+        for group, group_event in self._groups.items():
+            if group in self._listeners:
+                continue
+
+            changes = self._changes.setdefault(group.matcher, {})
+            joined_entities = self._joined.setdefault(group.matcher, set())
+            joined, updated, left = self._listeners[group] = (
+                self._get_listeners(changes, joined_entities))
+
+            if group_event != GroupEvent.REMOVED:
+                group.on_entity_joined += joined
+                group.on_entity_updated += updated
+
+            if group_event != GroupEvent.ADDED:
+                group.on_entity_left += left
+
+    def deactivate(self):
+        for group, (joined, updated, left) in self._listeners.items():
+            group.on_entity_joined -= joined
+            group.on_entity_updated -= updated
+            group.on_entity_left -= left
+
+        self._listeners.clear()
+        self.clear_collected_entities()
+
+    def clear_collected_entities(self):
+        for entity_changes in self._changes.values():
+            entity_changes.clear()
+        for joined_entities in self._joined.values():
+            joined_entities.clear()
+
+    def _get_listeners(self, changes, joined_entities):
+
+        def joined(entity, component):
+            if entity not in changes:
+                joined_entities.add(entity)
+            updated(entity, None, component)
+
+        def updated(entity, previous_comp, new_comp):
+            entity_changes = changes.setdefault(entity, {})
+            change = entity_changes.get(type(new_comp))
+            if change is None:
+                entity_changes[type(new_comp)] = [
+                    copy_component(previous_comp), copy_component(new_comp)]
+            else:
+                change[1] = copy_component(new_comp)
+
+        def left(entity, component):
+            if entity in joined_entities:
+                joined_entities.remove(entity)
+                del changes[entity]
+                return
+
+            # The entity was in the group before it got collected: what
+            # it got since it last joined the group is dropped.
+            entity_changes = changes.setdefault(entity, {})
+            for comp_type, change in list(entity_changes.items()):
+                if change[0] is None:
+                    del entity_changes[comp_type]
+
+            change = entity_changes.get(type(component))
+            if change is None:
+                entity_changes[type(component)] = [
+                    copy_component(component), None]
+            else:
+                change[1] = None
+
+        return joined, updated, left
+
+    def __repr__(self):
+        return '<ChangeCollector [{}]'.format(
+            ', '.join(map(str, self._groups)))
@@ -0,0 +1,80 @@
+"""
+entitas.columns
+~~~~~~~~~~~~~~~
+Batch access to the components of a group. The fields of each
+component type are gathered into columns, NumPy arrays when NumPy is
+installed and lists otherwise, so processors can update many entities
+with a few array operations and write the result back in one pass.
+
+    columns = group.columns(Position, Velocity)
+    position, velocity = columns[Position], columns[Velocity]
+    position.x += velocity.dx * dt
+    position.y += velocity.dy * dt
+    context.write_back(columns, Position)
+"""
+
+from types import SimpleNamespace
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def make_column(values):
+    return values if numpy is None else numpy.array(values)
+
+
+def to_list(column):
+    return column.tolist() if hasattr(column, 'tolist') else list(column)
+
+
+class ComponentColumns(object):
+    """Field columns of some component types for a fixed sequence of
+    entities. Use group.columns(*comp_types) to get them.
+    """
+
+    def __init__(self, entities, comp_types):
+
+        #: Entities, in the order of the rows of the columns.
+        self.entities = tuple(entities)
+
+        #: Gathered component types.
+        self.comp_types = comp_types
+
+        #: Dictionary mapping component types and their fields.
+        self._fields = {}
+
+        for comp_type in comp_types:
+            comps = [entity.get(comp_type) for entity in self.entities]
+            fields = zip(*comps) if comps else [()] * len(comp_type._fields)
+            self._fields[comp_type] = SimpleNamespace(**{
+                name: make_column(list(values))
+                for name, values in zip(comp_type._fields, fields)})
+
+    def __getitem__(self, comp_type):
+        """Returns the columns of a component type, as attributes named
+        after its fields. Columns can be updated in place or replaced.
+        :param comp_type: namedtuple type
+        """
+        return self._fields[comp_type]
+
+    def rows(self, comp_type):
+        """Iterates over the field values of a component type, one tuple
+        per entity.
+        :param comp_type: namedtuple type
+        """
+        fields = self._fields[comp_type]
+        columns = [to_list(getattr(fields, name))
+                   for name in comp_type._fields]
+        if not columns:
+            return iter([()] * len(self.entities))
+        return zip(*columns)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __repr__(self):
+        return '<ComponentColumns [{}] ({})>'.format(
+            ','.join([x.__name__ for x in self.comp_types]),
+            len(self.entities))
@@ -0,0 +1,171 @@
+"""
+entitas.command_buffer
+~~~~~~~~~~~~~~~~~~~~~~
+A command buffer records structural changes instead of applying them
+right away, so processors can change entities while iterating over a
+group. Changes are coalesced per entity and component type, then
+applied all at once when the buffer is flushed: replacing the same
+component several times results in a single notification.
+"""
+
+import threading
+
+from .exceptions import EntitasException
+
+#: Commands recorded for a component.
+ADD = 1
+REPLACE = 2
+REMOVE = 3
+
+#: Processor run by the current thread in a parallel stage of
+#: processors, as its attribute 'processor'.
+running = threading.local()
+
+
+class CommandBuffer(object):
+    """Use context.create_command_buffer() to create a command buffer.
+    Register it with processors.add_command_buffer(buffer) to flush it
+    at the end of every processors.execute(), or call flush() yourself.
+    """
+
+    def __init__(self, context):
+        self._context = context
+
+        #: Dictionary mapping entities and their pending changes: a
+        #: dictionary mapping component types and (command, args).
+        self._changes = {}
+
+        #: Dictionary mapping the entities to destroy, in order, and
+        #: their handle when the destruction got recorded.
+        self._destroyed = {}
+
+        #: During a parallel stage of processors, dictionary holding the
+        #: processor recording into the buffer, None otherwise.
+        self._claims = None
+
+    def create_entity(self):
+        """Creates an entity right away. It does not belong to any
+        group until components get added to it.
+        :rtype: Entity
+        """
+        return self._context.create_entity()
+
+    def add(self, entity, comp_type, *args):
+        """Records the addition of a component.
+        :param entity: Entity
+        :param comp_type: namedtuple type
+        :param *args: (optional) data values
+        """
+        if self._claims is not None:
+            self._claim()
+        changes = self._changes.setdefault(entity, {})
+        change = changes.get(comp_type)
+        command = REPLACE if change and change[0] == REMOVE else ADD
+        changes[comp_type] = (command, args)
+
+    def replace(self, entity, comp_type, *args):
+        """Records the replacement of a component, which gets added if
+        the entity does not have it.
+        :param entity: Entity
+        :param comp_type: namedtuple type
+        :param *args: (optional) data values
+        """
+        if self._claims is not None:
+            self._claim()
+        changes = self._changes.setdefault(entity, {})
+        change = changes.get(comp_type)
+        command = ADD if change and change[0] == ADD else REPLACE
+        changes[comp_type] = (command, args)
+
+    def remove(self, entity, comp_type):
+        """Records the removal of a component.
+        :param entity: Entity
+        :param comp_type: namedtuple type
+        """
+        if self._claims is not None:
+            self._claim()
+        changes = self._changes.setdefault(entity, {})
+        change = changes.get(comp_type)
+        if change and change[0] == ADD:
+            del changes[comp_type]
+        else:
+            changes[comp_type] = (REMOVE, None)
+
+    def destroy_entity(self, entity):
+        """Records the destruction of an entity. Its pending changes are
+        dropped.
+        :param entity: Entity
+        """
+        if self._claims is not None:
+            self._claim()
+        self._changes.pop(entity, None)
+        self._destroyed[entity] = entity.handle
+
+    def flush(self):
+        """Applies the recorded changes, entity by entity in recording
+        order, then destroys the recorded entities in one batch.
+        If a change fails, it is dropped and the exception propagates,
+        but the changes and destructions not applied yet are kept for
+        the next flush. Entities destroyed directly in the meantime are
+        skipped, even if their object got reused for a new entity.
+        """
+        changes, destroyed = self._changes, self._destroyed
+        self._changes, self._destroyed = {}, {}
+
+        try:
+            for entity in list(changes):
+                entity_changes = changes[entity]
+                for comp_type in list(entity_changes):
+                    command, args = entity_changes.pop(comp_type)
+                    if command == ADD:
+                        entity.add(comp_type, *args)
+                    elif command == REPLACE:
+                        entity.replace(comp_type, *args)
+                    else:
+                        entity.remove(comp_type)
+                del changes[entity]
+        except Exception:
+            self._keep(changes, destroyed)
+            raise
+
+        resolve = self._context.resolve
+        destroyed = [entity for entity, handle in destroyed.items()
+                     if resolve(handle) is entity]
+        if destroyed:
+            self._context.destroy_entities(destroyed)
+
+    def _keep(self, changes, destroyed):
+        """Puts back changes not applied by a flush, before the ones
+        recorded since it started.
+        """
+        for entity, entity_changes in self._changes.items():
+            changes.setdefault(entity, {}).update(entity_changes)
+        destroyed.update(self._destroyed)
+
+        self._changes = {entity: entity_changes
+                         for entity, entity_changes in changes.items()
+                         if entity_changes and entity not in destroyed}
+        self._destroyed = destroyed
+
+    def _claim(self):
+        """Checks that a single processor of a parallel stage records
+        into the buffer, as the order of records from several threads
+        would not be deterministic.
+        """
+        processor = getattr(running, 'processor', None)
+        if self._claims.setdefault('processor', processor) is not processor:
+            raise EntitasException(
+                'Processors running in parallel share a command buffer.',
+                'Give each processor of a parallel stage its own buffer.')
+
+    def clear(self):
+        """Drops the recorded changes."""
+        self._changes.clear()
+        self._destroyed.clear()
+
+    def __len__(self):
+        return (sum([len(changes) for changes in self._changes.values()]) +
+                len(self._destroyed))
+
+    def __repr__(self):
+        return '<CommandBuffer ({})>'.format(len(self))
@@ -0,0 +1,180 @@
+"""
+entitas.component
+~~~~~~~~~~~~~~~~~
+Components are namedtuples by default. Mutable components are an
+opt-in alternative for hot components: slotted objects with the same
+API as namedtuples, which entity.update() changes in place, and which
+are recycled through a pool of their type when they get replaced or
+removed.
+
+    Position = mutable_component('Position', 'x y')
+    entity.add(Position, 1, 2)
+    entity.update(Position, x=3)
+
+Listeners still get notified of replacements, with a copy of the
+previous values. As the components they receive get recycled, listeners
+must copy mutable components they keep, with copy_component(comp), as
+collectors and change journals do.
+"""
+
+import sys
+
+
+class MutableComponent(object):
+    """Base class of the types made by :func:`mutable_component`."""
+
+    __slots__ = ()
+
+    #: Field names, as with namedtuples.
+    _fields = ()
+
+    #: Recycled instances, and how many of them to keep at most.
+    _pool = None
+    _pool_size = 0
+
+    @classmethod
+    def _make(cls, iterable):
+        """Makes a component from a sequence of values, recycling a
+        released instance if there is one.
+        """
+        values = tuple(iterable)
+        if len(values) != len(cls._fields):
+            raise TypeError('Expected {} arguments, got {}'.format(
+                len(cls._fields), len(values)))
+
+        comp = cls._pool.pop() if cls._pool else object.__new__(cls)
+        for field, value in zip(cls._fields, values):
+            setattr(comp, field, value)
+        return comp
+
+    @classmethod
+    def _release(cls, comp):
+        """Gives back a component no longer used to the pool."""
+        if len(cls._pool) < cls._pool_size:
+            cls._pool.append(comp)
+
+    def __new__(cls, *args, **kwargs):
+        values = list(args) + [kwargs.pop(field)
+                               for field in cls._fields[len(args):]
+                               if field in kwargs]
+        if kwargs:
+            raise TypeError('Unexpected fields: {}'.format(
+                ', '.join(kwargs)))
+        return cls._make(values)
+
+    def _copy(self):
+        return type(self)._make(self)
+
+    def _replace(self, **kwargs):
+        """Returns a new component with some fields changed, as with
+        namedtuples.
+        """
+        comp = self._copy()
+        for field, value in kwargs.items():
+            if field not in self._fields:
+                raise ValueError('Got unexpected field name: {!r}'.format(
+                    field))
+            setattr(comp, field, value)
+        return comp
+
+    def _asdict(self):
+        return {field: getattr(self, field) for field in self._fields}
+
+    def __iter__(self):
+        for field in self._fields:
+            yield getattr(self, field)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __getitem__(self, index):
+        return getattr(self, self._fields[index])
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return type(self)._make, (tuple(self),)
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join([
+            '{}={!r}'.format(field, getattr(self, field))
+            for field in self._fields]))
+
+
+def copy_component(comp):
+    """Returns a copy of a mutable component, to keep it after it gets
+    changed in place or recycled, or the component itself otherwise.
+    """
+    if isinstance(comp, MutableComponent):
+        return comp._copy()
+    return comp
+
+
+def mutable_component(typename, field_names, pool_size=1024):
+    """Makes a mutable component type.
+    :param typename: str
+    :param field_names: str of names separated by spaces or commas, or
+        sequence of str, as with namedtuples
+    :param pool_size: (optional) maximum number of recycled instances
+    :rtype: type
+    """
+    if isinstance(field_names, str):
+        field_names = field_names.replace(',', ' ').split()
+    fields = tuple(field_names)
+
+    for name in (typename,) + fields:
+        if not name.isidentifier() or name.startswith('_'):
+            raise ValueError('Invalid name: {!r}'.format(name))
+
+    comp_type = type(typename, (MutableComponent,), {
+        '__slots__': fields,
+        '_fields': fields,
+        '_pool': [],
+        '_pool_size': pool_size,
+    })
+
+    # Specialized like the methods of namedtuples, which saves a loop
+    # and a tuple on the replace and update hot paths.
+    assignments = ''.join(['\n    comp.{0} = {0}'.format(field)
+                           for field in fields])
+    copies = ''.join(['\n    comp.{0} = self.{0}'.format(field)
+                      for field in fields])
+    source = (
+        'def _make(cls, iterable):\n'
+        '    try:\n'
+        '        [{fields}] = iterable\n'
+        '    except ValueError:\n'
+        '        raise TypeError({message!r}) from None\n'
+        '    comp = cls._pool.pop() if cls._pool else new(cls)'
+        '{assignments}\n'
+        '    return comp\n'
+        'def _copy(self):\n'
+        '    cls = type(self)\n'
+        '    comp = cls._pool.pop() if cls._pool else new(cls)'
+        '{copies}\n'
+        '    return comp\n'
+    ).format(fields=', '.join(fields), assignments=assignments,
+             copies=copies, message='Expected {} arguments'.format(
+                 len(fields)))
+    namespace = {'new': object.__new__}
+    exec(source, namespace)
+    comp_type._make = classmethod(namespace['_make'])
+    comp_type._copy = namespace['_copy']
+
+    # As with namedtuples, for pickle to find the type.
+    try:
+        comp_type.__module__ = sys._getframe(1).f_globals.get(
+            '__name__', '__main__')
+    except (AttributeError, ValueError):
+        pass
+
+    return comp_type
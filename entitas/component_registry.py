@@ -0,0 +1,39 @@
+"""
+entitas.component_registry
+~~~~~~~~~~~~~~~~~~~~~~~~~~
+Every component type gets its own bit the first time it is seen.
+An entity keeps the bits of its components in an integer signature
+and a matcher turns its conditions into masks, so checking whether
+an entity has a set of components is a couple of integer operations.
+"""
+
+#: Dictionary mapping component types and their bit.
+_bits = {}
+
+#: Dictionary caching the masks of tuples of component types.
+_masks = {}
+
+
+def get_bit(comp_type):
+    """Returns the bit of a component type, registering it if needed.
+    :param comp_type: namedtuple type
+    :rtype: int
+    """
+    bit = _bits.get(comp_type)
+    if bit is None:
+        bit = _bits.setdefault(comp_type, 1 << len(_bits))
+    return bit
+
+
+def get_mask(comp_types):
+    """Returns the union of the bits of some component types.
+    :param comp_types: tuple of namedtuple types
+    :rtype: int
+    """
+    mask = _masks.get(comp_types)
+    if mask is None:
+        mask = 0
+        for comp_type in comp_types:
+            mask |= get_bit(comp_type)
+        _masks[comp_types] = mask
+    return mask
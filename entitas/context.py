@@ -1,15 +1,75 @@
 from collections import deque
+from weakref import WeakValueDictionary
 
-from .entity import Entity
+from .entity import Entity, SLOT_BITS, SLOT_MASK
 from .matcher import Matcher
 from .group import Group
-from .exceptions import MissingEntity
+from .utils import Event
+from .command_buffer import CommandBuffer
+from .archetype import convert
+from .component import MutableComponent
+from .component_registry import get_bit, get_mask
+from .exceptions import (
+    AlreadyAddedComponent, MissingEntity, EntitasException)
+
+
+def find_joining_comp(matcher, comps):
+    """Returns the component whose addition makes an entity join the
+    group of the matcher when the components are added in order.
+    Returns None if the entity does not end up in the group.
+    """
+    signature = 0
+    joining_comp = None
+    for comp in comps:
+        signature |= get_bit(type(comp))
+        if not matcher.matches_signature(signature):
+            joining_comp = None
+        elif joining_comp is None:
+            joining_comp = comp
+    return joining_comp
+
+
+def find_leaving_comp(matcher, signature, comps):
+    """Returns the component whose removal makes an entity leave the
+    group of the matcher when the components are removed in order.
+    """
+    for comp in comps:
+        signature &= ~get_bit(type(comp))
+        if not matcher.matches_signature(signature):
+            return comp
+    return comps[-1]
+
+
+def get_archetype(entities):
+    """Returns the archetype holding all the entities, or None if they
+    are not stored in the same archetype.
+    """
+    archetypes = set([getattr(entity, '_archetype', None)
+                      for entity in entities])
+    if len(archetypes) == 1:
+        return archetypes.pop()
+    return None
+
+
+def is_unconstrained(matcher):
+    """Tells if a matcher has neither all_of nor any_of types, so that
+    adding a component of a type it does not mention can make an entity
+    match it.
+    """
+    return not matcher._all and not matcher._any
 
 
 class Context(object):
-    """A context is a data structure managing entities."""
+    """A context is a data structure managing entities.
+    By default, each entity keeps its own components. Pass an
+    :class:`ArchetypeStorage` to store them in columns instead.
+    """
+
+    def __init__(self, storage=None):
 
-    def __init__(self):
+        #: Storage backend of the components, None to keep them in the
+        #: entities.
+        self._storage = storage
 
         #: Entities retained by this context.
         self._entities = set()
@@ -17,18 +77,62 @@ class Context(object):
         #: An object pool to recycle entities.
         self._reusable_entities = deque()
 
+        #: Every entity object of the context, at the position of its
+        #: slot, to resolve handles.
+        self._slots = []
+
         #: Entities counter.
         self._entity_index = 0
 
         #: Dictionary of matchers mapping groups.
         self._groups = {}
 
+        #: Evicted groups still referred to elsewhere, by matcher. They
+        #: get registered again when read or asked for.
+        self._evicted_groups = WeakValueDictionary()
+
+        #: Dictionary of component types mapping the groups whose
+        #: matcher mentions them. Only those groups get notified when
+        #: a component of that type changes.
+        self._groups_for_type = {}
+
+        #: Groups whose matcher has neither all_of nor any_of types:
+        #: entities may join them when a component of any type gets
+        #: added, so they get notified of every change instead.
+        self._unconstrained_groups = []
+
+        #: Dictionary of component types mapping their entity indices
+        #: by name.
         self._entity_indices = {}
 
+        #: Occurs when an entity gets created.
+        self.on_entity_created = Event()
+
+        #: Occurs when an entity gets destroyed, after its components
+        #: got removed.
+        self.on_entity_destroyed = Event()
+
+        #: Occur when a component of any entity of the context gets
+        #: added, removed or replaced, after the groups got updated.
+        self.on_component_added = Event()
+        self.on_component_removed = Event()
+        self.on_component_replaced = Event()
+
+        #: Occurs when a group gets created.
+        self.on_group_created = Event()
+
     @property
     def entities(self):
         return self._entities
 
+    @property
+    def groups(self):
+        return list(self._groups.values())
+
+    @property
+    def storage(self):
+        return self._storage
+
     def has_entity(self, entity):
         """Checks if the context contains this entity.
         :param entity: Entity
@@ -36,6 +140,20 @@ class Context(object):
         """
         return entity in self._entities
 
+    def resolve(self, handle):
+        """Returns the entity of a handle, or None if it got destroyed.
+        :param handle: int, see entity.handle
+        :rtype: Entity
+        """
+        slot = handle & SLOT_MASK
+        if slot >= len(self._slots):
+            return None
+
+        entity = self._slots[slot]
+        if entity._generation != handle >> SLOT_BITS or not entity._is_enabled:
+            return None
+        return entity
+
     def create_entity(self):
         """Creates an entity. Pop one entity from the pool if it is not
         empty, otherwise creates a new one. Increments the entity index.
@@ -43,19 +161,130 @@ class Context(object):
         :rtype: Entity
         """
         entity = (self._reusable_entities.pop() if self._reusable_entities
-                  else Entity())
-
-        entity.activate(self._entity_index)
-        self._entity_index += 1
+                  else self._add_slot(self._new_entity()))
 
+        self._activate_entity(entity)
         self._entities.add(entity)
+        self.on_entity_created(entity)
+
+        return entity
+
+    def create_entities(self, count, components=()):
+        """Creates many entities having the same components. Group
+        membership is computed once for all of them, then each group
+        adds them in one batch. Listeners added directly on recycled
+        entities are notified afterwards.
+        :param count: int
+        :param components: (optional) sequence of (comp_type, *args)
+        :rtype: list
+        """
+        comps = [comp_type._make(args) for comp_type, *args in components]
+        comp_types = tuple([type(comp) for comp in comps])
+        if len(set(comp_types)) != len(comp_types):
+            raise AlreadyAddedComponent(
+                'Cannot create entities with the same component twice: {}.'
+                .format(', '.join([x.__name__ for x in comp_types])))
+
+        if count <= 0:
+            return []
 
-        entity.on_component_added += self._comp_added_or_removed
-        entity.on_component_removed += self._comp_added_or_removed
-        entity.on_component_replaced += self._comp_replaced
+        signature = get_mask(comp_types)
 
+        reusable_count = min(count, len(self._reusable_entities))
+        entities = [self._reusable_entities.pop()
+                    for _ in range(reusable_count)]
+        entities.extend([self._add_slot(self._new_entity())
+                         for _ in range(count - reusable_count)])
+
+        # Mutable components are changed in place and recycled: each
+        # entity needs its own instances.
+        if any([isinstance(comp, MutableComponent) for comp in comps]):
+            comps_list = [comps] + [
+                [comp._copy() if isinstance(comp, MutableComponent)
+                 else comp for comp in comps]
+                for _ in range(count - 1)]
+        else:
+            comps_list = [comps] * count
+
+        for entity, entity_comps in zip(entities, comps_list):
+            self._activate_entity(entity)
+            if comps:
+                entity._add_all_silently(entity_comps, signature)
+
+        self._entities.update(entities)
+        self._join_groups(comp_types, entities, comps_list)
+
+        return entities
+
+    def _restore_entities(self, entries):
+        """Creates entities with the given creation indices and
+        components. Group membership is computed once per set of
+        component types, as in create_entities().
+        :param entries: iterable of (creation_index, comps)
+        :rtype: dict mapping creation indices and entities
+        """
+        restored = {}
+        buckets = {}
+
+        for creation_index, comps in entries:
+            entity = (self._reusable_entities.pop()
+                      if self._reusable_entities
+                      else self._add_slot(self._new_entity()))
+            entity.activate(creation_index, self)
+            self._entity_index = max(self._entity_index, creation_index + 1)
+
+            comp_types = tuple([type(comp) for comp in comps])
+            if comps:
+                entity._add_all_silently(comps, get_mask(comp_types))
+
+            bucket = buckets.setdefault(comp_types, ([], []))
+            bucket[0].append(entity)
+            bucket[1].append(comps)
+            restored[creation_index] = entity
+
+        self._entities.update(restored.values())
+
+        for comp_types, (entities, comps_list) in buckets.items():
+            self._join_groups(comp_types, entities, comps_list)
+
+        return restored
+
+    def _join_groups(self, comp_types, entities, comps_list):
+        """Adds new entities sharing the same component types to the
+        groups they match, one batch per group, then notifies the
+        listeners of the context and of the entities.
+        """
+        for group in self._get_groups(comp_types):
+            comp = find_joining_comp(group.matcher, comps_list[0])
+            if comp is not None:
+                position = comp_types.index(type(comp))
+                group.add_entities([
+                    (entity, comps[position])
+                    for entity, comps in zip(entities, comps_list)])
+
+        for entity, comps in zip(entities, comps_list):
+            self.on_entity_created(entity)
+            for comp in comps:
+                self.on_component_added(entity, comp)
+            if entity._on_component_added is not None:
+                for comp in comps:
+                    entity._on_component_added(entity, comp)
+
+    def _new_entity(self):
+        if self._storage is None:
+            return Entity()
+        return self._storage.create_entity()
+
+    def _add_slot(self, entity):
+        """Gives its slot to a new entity object."""
+        entity._slot = len(self._slots)
+        self._slots.append(entity)
         return entity
 
+    def _activate_entity(self, entity):
+        entity.activate(self._entity_index, self)
+        self._entity_index += 1
+
     def destroy_entity(self, entity):
         """Removes an entity from the list and add it to the pool. If
         the context does not contain this entity, a
@@ -69,24 +298,184 @@ class Context(object):
 
         self._entities.remove(entity)
         self._reusable_entities.append(entity)
+        self.on_entity_destroyed(entity)
+
+    def destroy_entities(self, entities):
+        """Destroys many entities. Each group removes its members in one
+        batch, then their components are dropped without going through
+        each component removal. Listeners added directly on the
+        entities are notified afterwards. If the context does not
+        contain one of them, a :class:`MissingEntity` exception is
+        raised before any change.
+        :param entities: iterable of Entity
+        """
+        entities = list(dict.fromkeys(entities))
+        for entity in entities:
+            if not self.has_entity(entity):
+                raise MissingEntity()
+
+        removals = {}
+        removed_comps = []
+
+        for entity in entities:
+            entity._is_enabled = False
+            comps = entity.get_components()
+            signature = entity._signature
+            removed_comps.append(comps)
+
+            for group in self._get_groups([type(comp) for comp in comps]):
+                if entity in group._entities:
+                    comp = find_leaving_comp(group.matcher, signature, comps)
+                    removals.setdefault(group, []).append((entity, comp))
+
+        for group, changes in removals.items():
+            group.remove_entities(changes)
 
-    def get_group(self, matcher):
+        for entity in entities:
+            entity._remove_all_silently()
+
+        self._entities.difference_update(entities)
+        self._reusable_entities.extend(entities)
+
+        for entity, comps in zip(entities, removed_comps):
+            for comp in comps:
+                self.on_component_removed(entity, comp)
+            if entity._on_component_removed is not None:
+                for comp in comps:
+                    entity._on_component_removed(entity, comp)
+            self.on_entity_destroyed(entity)
+
+    def get_group(self, matcher, lazy=False):
         """User can ask for a group of entities from the context. The
         group is identified through a :class:`Matcher`.
+        A lazy group only gets populated, and then kept up to date, when
+        its entities are read for the first time: it suits queries read
+        through group.entities, not listeners.
         :param entity: Matcher
+        :param lazy: (optional) bool
         """
-        if matcher in self._groups:
-            return self._groups[matcher]
+        group = self._groups.get(matcher)
+        if group is None:
+            group = self._evicted_groups.pop(matcher, None)
+            if group is not None:
+                self._groups[matcher] = group
 
-        group = Group(matcher)
-
-        for entity in self._entities:
-            group.handle_entity_silently(entity)
+        if group is not None:
+            if not lazy and not group.is_materialized:
+                self._materialize_group(group)
+            return group
 
+        group = Group(matcher)
         self._groups[matcher] = group
 
+        if lazy:
+            group._context = self
+        else:
+            self._materialize_group(group)
+
+        self.on_group_created(group)
         return group
 
+    def demote_idle_groups(self, max_idle_count=1, evict=False):
+        """Stops updating the groups without listeners whose entities
+        were not read since the last max_idle_count calls, and frees
+        their entities. They get built again on their next read. Call it
+        periodically, such as once per frame.
+        :param max_idle_count: (optional) int
+        :param evict: (optional) bool, also forget the idle groups, so
+            that the ones nobody refers to get garbage collected. The
+            others get registered again on their next read.
+        :rtype: int, the number of groups demoted
+        """
+        demoted_count = 0
+
+        for group in list(self._groups.values()):
+            if group._was_read:
+                group._was_read = False
+                group._idle_count = 0
+                continue
+
+            group._idle_count += 1
+            if group._idle_count < max_idle_count or group.has_listeners():
+                continue
+
+            if group.is_materialized:
+                self._unroute_group(group)
+                group._entities = set()
+                group._snapshot = None
+                group._context = self
+                demoted_count += 1
+
+            if evict:
+                del self._groups[group.matcher]
+                self._evicted_groups[group.matcher] = group
+
+        return demoted_count
+
+    def create_command_buffer(self):
+        """Creates a buffer recording structural changes to apply them
+        later. See :class:`CommandBuffer`.
+        :rtype: CommandBuffer
+        """
+        return CommandBuffer(self)
+
+    def write_back(self, columns, *comp_types):
+        """Writes columns gathered by group.columns() back to their
+        entities. Only the components whose values changed are replaced,
+        then each group is notified once with all the changes, before
+        the listeners added directly on the entities.
+
+        When all the entities live in the same archetype, rows are
+        compared and written straight in its columns. Otherwise, each
+        component is read and stored through its entity.
+        :param columns: ComponentColumns
+        :param comp_types: (optional) namedtuple types to write, all the
+            gathered types by default
+        """
+        archetype = get_archetype(columns.entities)
+
+        for comp_type in comp_types or columns.comp_types:
+            changes = []
+            rows = zip(columns.entities, columns.rows(comp_type))
+
+            if archetype is not None and comp_type in archetype.columns:
+                # Every row is converted before any gets written, so that
+                # a value rejected by a typed column changes nothing.
+                fields = archetype.columns[comp_type]
+                converted_rows = []
+                for entity, values in rows:
+                    row = entity._row
+                    previous_values = tuple([column[row]
+                                             for column in fields])
+                    if previous_values != values:
+                        converted_rows.append((row, [
+                            convert(column, value)
+                            for column, value in zip(fields, values)]))
+                        changes.append((entity,
+                                        comp_type._make(previous_values),
+                                        comp_type._make(values)))
+
+                for row, converted in converted_rows:
+                    for column, value in zip(fields, converted):
+                        column[row] = value[0]
+            else:
+                for entity, values in rows:
+                    previous_comp = entity.get(comp_type)
+                    if tuple(previous_comp) != values:
+                        new_comp = comp_type._make(values)
+                        entity._store(comp_type, new_comp)
+                        changes.append((entity, previous_comp, new_comp))
+
+            if changes:
+                for group in self._get_groups((comp_type,)):
+                    group.update_entities(changes)
+
+            for entity, previous_comp, new_comp in changes:
+                self.on_component_replaced(entity, previous_comp, new_comp)
+                if entity._on_component_replaced is not None:
+                    entity._on_component_replaced(
+                        entity, previous_comp, new_comp)
+
     def set_unique_component(self, comp_type, *args):
         self.create_entity().add(comp_type, *args)
 
@@ -95,19 +484,108 @@ class Context(object):
         return group.single_entity.get(comp_type)
 
     def add_entity_index(self, entity_index):
-        self._entity_indices[entity_index.type] = entity_index
+        """Registers an entity index under its component type and name.
+        An index with the same type and name gets replaced.
+        :param entity_index: AbstractEntityIndex
+        """
+        indices = self._entity_indices.setdefault(entity_index.type, {})
+        indices[entity_index.name] = entity_index
+
+    def get_entity_index(self, comp_type, name=None):
+        """Retrieves an entity index by its component type, and by its
+        name when there are several indices for this type.
+        :param comp_type: namedtuple type
+        :param name: (optional) str
+        :rtype: AbstractEntityIndex
+        """
+        indices = self._entity_indices[comp_type]
+        if name is not None:
+            return indices[name]
+
+        if len(indices) > 1:
+            raise EntitasException(
+                'There are {} entity indices for {!r}.'
+                .format(len(indices), comp_type.__name__),
+                'Pass one of their names: {}.'.format(', '.join(indices)))
+
+        return next(iter(indices.values()))
+
+    def get_entity_indices(self, comp_type):
+        """Retrieves all the entity indices of a component type.
+        :param comp_type: namedtuple type
+        :rtype: list
+        """
+        return list(self._entity_indices.get(comp_type, {}).values())
+
+    def _materialize_group(self, group):
+        """Populates a group and starts updating it."""
+        group._context = None
+        group._idle_count = 0
+        self._evicted_groups.pop(group.matcher, None)
+        self._groups.setdefault(group.matcher, group)
+
+        for entity in self._entities:
+            group.handle_entity_silently(entity)
+
+        self._route_group(group)
+
+    def _route_group(self, group):
+        """Starts notifying a group of the changes it may depend on."""
+        if is_unconstrained(group.matcher):
+            self._unconstrained_groups.append(group)
+            return
+
+        for comp_type in group.matcher.comp_types:
+            self._groups_for_type.setdefault(comp_type, []).append(group)
+
+    def _unroute_group(self, group):
+        if is_unconstrained(group.matcher):
+            self._unconstrained_groups.remove(group)
+            return
+
+        for comp_type in group.matcher.comp_types:
+            self._groups_for_type[comp_type].remove(group)
+
+    def _get_groups(self, comp_types):
+        """Returns the groups whose matcher mentions any of the
+        component types, each one once, and the unconstrained groups
+        when there is any type.
+        """
+        groups = {}
+        for comp_type in comp_types:
+            for group in self._groups_for_type.get(comp_type, ()):
+                groups[group] = None
+        if comp_types:
+            for group in self._unconstrained_groups:
+                groups[group] = None
+        return list(groups)
 
-    def get_entity_index(self, comp_type):
-        return self._entity_indices[comp_type]
+    def _comp_added(self, entity, comp):
+        groups = self._groups_for_type.get(type(comp))
+        if groups:
+            for group in groups:
+                group.handle_entity(entity, comp)
+        for group in self._unconstrained_groups:
+            group.handle_entity(entity, comp)
+        self.on_component_added(entity, comp)
 
-    def _comp_added_or_removed(self, entity, comp):
-        for matcher in self._groups:
-            self._groups[matcher].handle_entity(entity, comp)
+    def _comp_removed(self, entity, comp):
+        groups = self._groups_for_type.get(type(comp))
+        if groups:
+            for group in groups:
+                group.handle_entity(entity, comp)
+        for group in self._unconstrained_groups:
+            group.handle_entity(entity, comp)
+        self.on_component_removed(entity, comp)
 
     def _comp_replaced(self, entity, previous_comp, new_comp):
-        for matcher in self._groups:
-            group = self._groups[matcher]
+        groups = self._groups_for_type.get(type(new_comp))
+        if groups:
+            for group in groups:
+                group.update_entity(entity, previous_comp, new_comp)
+        for group in self._unconstrained_groups:
             group.update_entity(entity, previous_comp, new_comp)
+        self.on_component_replaced(entity, previous_comp, new_comp)
 
     def __repr__(self):
         return '<Context ({}/{})>'.format(
@@ -6,13 +6,20 @@ objects in your application. You can add, replace or remove data
 from entities.
 
 Those containers are called 'components'. They are represented by
-namedtuples for readability.
+namedtuples for readability, or by mutable components for hot ones.
 """
 
 from .utils import Event
+from .component import MutableComponent
+from .component_registry import get_bit, get_mask
 from .exceptions import (
     EntityNotEnabled, AlreadyAddedComponent, MissingComponent)
 
+#: A handle packs the generation of an entity above the number of bits
+#: of its slot in the context.
+SLOT_BITS = 32
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
 
 class Entity(object):
     """Use context.create_entity() to create a new entity and
@@ -20,20 +27,28 @@ class Entity(object):
     You can add, replace and remove components to an entity.
     """
 
-    def __init__(self):
+    __slots__ = (
+        '_context', '_on_component_added', '_on_component_removed',
+        '_on_component_replaced', '_components', '_signature',
+        '_creation_index', '_is_enabled', '_slot', '_generation')
 
-        #: Occurs when a component gets added.
-        self.on_component_added = Event()
+    def __init__(self):
 
-        #: Occurs when a component gets removed.
-        self.on_component_removed = Event()
+        #: Context owning the entity. It is notified directly of every
+        #: component change, before the events.
+        self._context = None
 
-        #: Occurs when a component gets replaced.
-        self.on_component_replaced = Event()
+        #: Events are only allocated when a listener subscribes.
+        self._on_component_added = None
+        self._on_component_removed = None
+        self._on_component_replaced = None
 
         #: Dictionary mapping component type and component instance.
         self._components = {}
 
+        #: Bits of the component types held by the entity.
+        self._signature = 0
+
         #: Each entity has its own unique creationIndex which will be
         #: set by the context when you create the entity.
         self._creation_index = 0
@@ -42,9 +57,62 @@ class Entity(object):
         #: Active entities are enabled, destroyed entities are not.
         self._is_enabled = False
 
-    def activate(self, creation_index):
+        #: Position of the entity in the slots of its context, and
+        #: number of times it got activated. Together, they make its
+        #: handle.
+        self._slot = 0
+        self._generation = 0
+
+    @property
+    def on_component_added(self):
+        """Occurs when a component gets added."""
+        if self._on_component_added is None:
+            self._on_component_added = Event()
+        return self._on_component_added
+
+    @on_component_added.setter
+    def on_component_added(self, event):
+        self._on_component_added = event
+
+    @property
+    def on_component_removed(self):
+        """Occurs when a component gets removed."""
+        if self._on_component_removed is None:
+            self._on_component_removed = Event()
+        return self._on_component_removed
+
+    @on_component_removed.setter
+    def on_component_removed(self, event):
+        self._on_component_removed = event
+
+    @property
+    def on_component_replaced(self):
+        """Occurs when a component gets replaced."""
+        if self._on_component_replaced is None:
+            self._on_component_replaced = Event()
+        return self._on_component_replaced
+
+    @on_component_replaced.setter
+    def on_component_replaced(self, event):
+        self._on_component_replaced = event
+
+    @property
+    def creation_index(self):
+        return self._creation_index
+
+    @property
+    def handle(self):
+        """Int identifying the entity in its context until it gets
+        destroyed, unlike the entity object, which gets reused. See
+        context.resolve(handle).
+        """
+        return (self._generation << SLOT_BITS) | self._slot
+
+    def activate(self, creation_index, context=None):
         self._creation_index = creation_index
+        self._context = context
         self._is_enabled = True
+        self._generation += 1
 
     def add(self, comp_type, *args):
         """Adds a component.
@@ -61,9 +129,13 @@ class Entity(object):
                 'Cannot add another component {!r} to {}.'
                 .format(comp_type.__name__, self))
 
+        self._add(comp_type, args)
+
+    def _add(self, comp_type, args):
         new_comp = comp_type._make(args)
         self._components[comp_type] = new_comp
-        self.on_component_added(self, new_comp)
+        self._signature |= get_bit(comp_type)
+        self._notify_added(new_comp)
 
     def remove(self, comp_type):
         """Removes a component.
@@ -101,11 +173,86 @@ class Entity(object):
         previous_comp = self._components[comp_type]
         if args is None:
             del self._components[comp_type]
-            self.on_component_removed(self, previous_comp)
+            self._signature &= ~get_bit(comp_type)
+            self._notify_removed(previous_comp)
         else:
             new_comp = comp_type._make(args)
             self._components[comp_type] = new_comp
-            self.on_component_replaced(self, previous_comp, new_comp)
+            self._notify_replaced(previous_comp, new_comp)
+
+        if isinstance(previous_comp, MutableComponent):
+            comp_type._release(previous_comp)
+
+    def update(self, comp_type, **fields):
+        """Changes some fields of an existing component. A mutable
+        component gets changed in place, a namedtuple gets replaced.
+        Either way, it notifies a replacement.
+        :param comp_type: namedtuple or mutable component type
+        :param **fields: new field values
+        """
+        if not self._is_enabled:
+            raise EntityNotEnabled(
+                'Cannot update component {!r}: {} is not enabled.'
+                .format(comp_type.__name__, self))
+
+        if not self.has(comp_type):
+            raise MissingComponent(
+                'Cannot update unexisting component {!r} of {}.'
+                .format(comp_type.__name__, self))
+
+        self._update(comp_type, fields)
+
+    def _update(self, comp_type, fields):
+        comp = self._components[comp_type]
+        if not isinstance(comp, MutableComponent):
+            self._replace(comp_type, tuple(comp._replace(**fields)))
+            return
+
+        for field in fields:
+            if field not in comp_type._fields:
+                raise ValueError('Got unexpected field name: {!r}'.format(
+                    field))
+
+        previous_comp = comp._copy()
+        for field, value in fields.items():
+            setattr(comp, field, value)
+        self._notify_replaced(previous_comp, comp)
+        comp_type._release(previous_comp)
+
+    def _notify_added(self, comp):
+        if self._context is not None:
+            self._context._comp_added(self, comp)
+        if self._on_component_added is not None:
+            self._on_component_added(self, comp)
+
+    def _notify_removed(self, comp):
+        if self._context is not None:
+            self._context._comp_removed(self, comp)
+        if self._on_component_removed is not None:
+            self._on_component_removed(self, comp)
+
+    def _notify_replaced(self, previous_comp, new_comp):
+        if self._context is not None:
+            self._context._comp_replaced(self, previous_comp, new_comp)
+        if self._on_component_replaced is not None:
+            self._on_component_replaced(self, previous_comp, new_comp)
+
+    def _store(self, comp_type, comp):
+        """Replaces an existing component without any notification."""
+        self._components[comp_type] = comp
+
+    def _add_all_silently(self, comps, signature):
+        """Adds components to an entity having none of their types,
+        without any notification. signature holds their bits.
+        """
+        for comp in comps:
+            self._components[type(comp)] = comp
+        self._signature |= signature
+
+    def _remove_all_silently(self):
+        """Removes all components without any notification."""
+        self._components.clear()
+        self._signature = 0
 
     def get(self, comp_type):
         """Retrieves a component by its type.
@@ -119,6 +266,12 @@ class Entity(object):
 
         return self._components[comp_type]
 
+    def get_components(self):
+        """Retrieves all the components of the entity.
+        :rtype: list
+        """
+        return list(self._components.values())
+
     def has(self, *args):
         """Checks if the entity has all components of the given type(s).
         :param args: namedtuple types
@@ -127,19 +280,20 @@ class Entity(object):
         if len(args) == 1:
             return args[0] in self._components
 
-        return all([comp_type in self._components for comp_type in args])
+        mask = get_mask(args)
+        return self._signature & mask == mask
 
     def has_any(self, *args):
         """Checks if the entity has any component of the given type(s).
         :param args: namedtuple types
         :rtype: bool
         """
-        return any([comp_type in self._components for comp_type in args])
+        return self._signature & get_mask(args) != 0
 
     def remove_all(self):
         """Removes all components."""
-        for comp_type in list(self._components):
-            self._replace(comp_type, None)
+        for comp in self.get_components():
+            self._replace(type(comp), None)
 
     def destroy(self):
         """This method is used internally. Don't call it yourself.
@@ -152,4 +306,4 @@ class Entity(object):
         """ <Entity_0 [Position(x=1, y=2, z=3)]> """
         return '<Entity_{} [{}]>'.format(
             self._creation_index,
-            ', '.join([str(self._components[x]) for x in self._components]))
+            ', '.join([str(comp) for comp in self.get_components()]))
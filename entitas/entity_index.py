@@ -1,14 +1,30 @@
 from abc import ABCMeta, abstractmethod
+from bisect import bisect_left
+from itertools import product
+from math import floor
 
 from .exceptions import EntitasException
 
 
 class AbstractEntityIndex(metaclass=ABCMeta):
+    """Indexes the entities of a group by keys computed from one of
+    their components. By default, each field gives a separate key.
+    With composite=True, the tuple of the fields is the only key. With
+    a key function, its result for the component is the only key.
 
-    def __init__(self, comp_type, group, *fields):
+    The name identifies the index in the context, among the indices of
+    the same component type. It defaults to the fields or the name of
+    the key function.
+    """
+
+    def __init__(self, comp_type, group, *fields, composite=False, key=None,
+                 name=None):
         self.type = comp_type
+        self.name = name or (key.__name__ if key else ','.join(fields))
         self._group = group
         self._fields = fields
+        self._composite = composite
+        self._key = key
         self._index = {}
         self._activate()
 
@@ -16,28 +32,65 @@ class AbstractEntityIndex(metaclass=ABCMeta):
         self._deactivate()
 
     def _activate(self):
-        self._group.on_entity_added += self._on_entity_added
-        self._group.on_entity_removed += self._on_entity_removed
+        self._group.on_entity_joined += self._on_entity_added
+        self._group.on_entity_left += self._on_entity_removed
+        self._group.on_entity_updated += self._on_entity_updated
         self._index_entities()
         return self
 
     def _deactivate(self):
-        self._group.on_entity_added -= self._on_entity_added
-        self._group.on_entity_removed -= self._on_entity_removed
+        self._group.on_entity_joined -= self._on_entity_added
+        self._group.on_entity_left -= self._on_entity_removed
+        self._group.on_entity_updated -= self._on_entity_updated
         self._index.clear()
 
     def _index_entities(self):
         for entity in self._group.entities:
-            for field in self._fields:
-                self._add_entity(getattr(entity.get(self.type), field), entity)
+            for key in self._get_keys(entity.get(self.type)):
+                self._add_entity(key, entity)
 
     def _on_entity_added(self, entity, component):
-        for field in self._fields:
-            self._add_entity(getattr(component, field), entity)
+        component = self._get_component(entity, component)
+        for key in self._get_keys(component):
+            self._add_entity(key, entity)
 
     def _on_entity_removed(self, entity, component):
-        for field in self._fields:
-            self._remove_entity(getattr(component, field), entity)
+        component = self._get_component(entity, component)
+        for key in self._get_keys(component):
+            self._remove_entity(key, entity)
+
+    def _on_entity_updated(self, entity, previous_comp, new_comp):
+        """Moves the entity only for the keys which changed."""
+        if type(new_comp) is not self.type:
+            return
+
+        changed_keys = [
+            (previous_key, new_key) for previous_key, new_key
+            in zip(self._get_keys(previous_comp), self._get_keys(new_comp))
+            if previous_key != new_key]
+
+        for previous_key, _ in changed_keys:
+            self._remove_entity(previous_key, entity)
+        for _, new_key in changed_keys:
+            self._add_entity(new_key, entity)
+
+    def _get_keys(self, component):
+        if self._key is not None:
+            return [self._key(component)]
+
+        if self._composite:
+            return [tuple([getattr(component, field)
+                           for field in self._fields])]
+
+        return [getattr(component, field) for field in self._fields]
+
+    def _get_component(self, entity, component):
+        """Groups pass the component which made the entity join or leave,
+        which may be of another type than the indexed one.
+        """
+        if type(component) is self.type:
+            return component
+        return entity.get(self.type)
 
     @abstractmethod
     def _add_entity(self, key, entity):
@@ -49,6 +102,13 @@ class AbstractEntityIndex(metaclass=ABCMeta):
 
 
 class EntityIndex(AbstractEntityIndex):
+    """With handles=True, the index stores the handles of the entities
+    instead of the entities. See context.resolve(handle).
+    """
+
+    def __init__(self, comp_type, group, *fields, handles=False, **kwargs):
+        self._handles = handles
+        super().__init__(comp_type, group, *fields, **kwargs)
 
     def get_entities(self, key):
         if key not in self._index:
@@ -56,13 +116,22 @@ class EntityIndex(AbstractEntityIndex):
         return self._index[key]
 
     def _add_entity(self, key, entity):
-        self.get_entities(key).add(entity)
+        self.get_entities(key).add(entity.handle if self._handles
+                                   else entity)
 
     def _remove_entity(self, key, entity):
-        self.get_entities(key).remove(entity)
+        self.get_entities(key).remove(entity.handle if self._handles
+                                      else entity)
 
 
 class PrimaryEntityIndex(AbstractEntityIndex):
+    """With handles=True, the index stores the handles of the entities
+    instead of the entities. See context.resolve(handle).
+    """
+
+    def __init__(self, comp_type, group, *fields, handles=False, **kwargs):
+        self._handles = handles
+        super().__init__(comp_type, group, *fields, **kwargs)
 
     def get_entity(self, key):
         return self._index[key]
@@ -73,7 +142,229 @@ class PrimaryEntityIndex(AbstractEntityIndex):
                 "Entity for key '{key}' already exists!".format(key=key),
                 "Only one entity for a primary key is allowed.")
 
-        self._index[key] = entity
+        self._index[key] = entity.handle if self._handles else entity
 
     def _remove_entity(self, key, entity):
         del self._index[key]
+
+
+class RangeEntityIndex(AbstractEntityIndex):
+    """Keeps the entities sorted by key, for ordered queries. Lookups
+    are logarithmic, maintenance is a binary search plus a list
+    insertion or deletion. Keys must be comparable with each other.
+    As with the other indices, the keys of all the fields go into the
+    same structure: use one index per field to query them separately.
+    """
+
+    def __init__(self, comp_type, group, *fields, **kwargs):
+
+        #: Sorted list of (key, creation index) pairs.
+        self._keys = []
+
+        #: Entities, in the order of the keys.
+        self._entities = []
+
+        super().__init__(comp_type, group, *fields, **kwargs)
+
+    def _deactivate(self):
+        super()._deactivate()
+        self._keys.clear()
+        self._entities.clear()
+
+    def range(self, low=None, high=None):
+        """Returns the entities whose key is in [low, high), sorted by
+        key. A bound set to None is not checked.
+        :rtype: list
+        """
+        start = 0 if low is None else bisect_left(self._keys, (low,))
+        stop = (len(self._keys) if high is None
+                else bisect_left(self._keys, (high,)))
+        return self._entities[start:stop]
+
+    def min(self):
+        """Returns the entity with the smallest key, None if empty."""
+        return self._entities[0] if self._entities else None
+
+    def max(self):
+        """Returns the entity with the largest key, None if empty."""
+        return self._entities[-1] if self._entities else None
+
+    def smallest(self, count):
+        """Returns the count entities with the smallest keys.
+        :rtype: list
+        """
+        return self._entities[:count]
+
+    def largest(self, count):
+        """Returns the count entities with the largest keys, the largest
+        first.
+        :rtype: list
+        """
+        return self._entities[:-count - 1:-1] if count > 0 else []
+
+    def _add_entity(self, key, entity):
+        entry = (key, entity.creation_index)
+        position = bisect_left(self._keys, entry)
+        self._keys.insert(position, entry)
+        self._entities.insert(position, entity)
+
+    def _remove_entity(self, key, entity):
+        position = bisect_left(self._keys, (key, entity.creation_index))
+        del self._keys[position]
+        del self._entities[position]
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class AbstractSpatialEntityIndex(AbstractEntityIndex):
+    """Indexes entities by the position made of some coordinate fields
+    of a component, such as 'x', 'y' and optionally 'z', or computed by
+    a key function.
+    """
+
+    def __init__(self, comp_type, group, *fields, **kwargs):
+        kwargs.setdefault('composite', True)
+        super().__init__(comp_type, group, *fields, **kwargs)
+
+    def query_box(self, low, high):
+        """Returns the entities whose position is within the box, bounds
+        included.
+        :param low: sequence of the lowest coordinates
+        :param high: sequence of the highest coordinates
+        :rtype: list
+        """
+        return [entity for entity, _ in self._iter_box(low, high)]
+
+    def query_radius(self, center, radius):
+        """Returns the entities whose position is within the radius.
+        :param center: sequence of coordinates
+        :param radius: number
+        :rtype: list
+        """
+        low = [coord - radius for coord in center]
+        high = [coord + radius for coord in center]
+        square_radius = radius * radius
+        return [entity for entity, position in self._iter_box(low, high)
+                if sum([(p - c) * (p - c) for p, c in zip(position, center)])
+                <= square_radius]
+
+    @abstractmethod
+    def _iter_box(self, low, high):
+        """Yields (entity, position) for the positions within the box."""
+        pass
+
+
+def in_box(position, low, high):
+    for coord, low_coord, high_coord in zip(position, low, high):
+        if coord < low_coord or coord > high_coord:
+            return False
+    return True
+
+
+class SpatialEntityIndex(AbstractSpatialEntityIndex):
+    """Uniform hash grid: entities are bucketed by cell, so a query only
+    visits the cells overlapping its box. cell_size should be close to
+    the usual query radius.
+    """
+
+    def __init__(self, comp_type, group, *fields, cell_size=1.0, **kwargs):
+        self._cell_size = cell_size
+        super().__init__(comp_type, group, *fields, **kwargs)
+
+    def _get_cell(self, position):
+        return tuple([int(floor(coord / self._cell_size))
+                      for coord in position])
+
+    def _iter_cells(self, low, high):
+        low_cell = self._get_cell(low)
+        high_cell = self._get_cell(high)
+
+        cell_count = 1
+        for low_coord, high_coord in zip(low_cell, high_cell):
+            cell_count *= max(high_coord - low_coord + 1, 0)
+
+        if cell_count > len(self._index):
+            return [cell for cell in self._index
+                    if in_box(cell, low_cell, high_cell)]
+
+        return product(*[range(low_coord, high_coord + 1)
+                         for low_coord, high_coord in zip(low_cell,
+                                                          high_cell)])
+
+    def _iter_box(self, low, high):
+        for cell in self._iter_cells(low, high):
+            entities = self._index.get(cell)
+            if entities:
+                for entity, position in entities.items():
+                    if in_box(position, low, high):
+                        yield entity, position
+
+    def _add_entity(self, position, entity):
+        cell = self._get_cell(position)
+        entities = self._index.get(cell)
+        if entities is None:
+            entities = self._index[cell] = {}
+        entities[entity] = position
+
+    def _remove_entity(self, position, entity):
+        cell = self._get_cell(position)
+        entities = self._index[cell]
+        del entities[entity]
+        if not entities:
+            del self._index[cell]
+
+
+class KDTreeEntityIndex(AbstractSpatialEntityIndex):
+    """k-d tree over the positions, rebuilt on the first query after a
+    change. It suits positions that change less often than they are
+    queried, or that are too unevenly spread for a grid.
+    """
+
+    def __init__(self, comp_type, group, *fields, **kwargs):
+
+        #: Root node, None when it has to be rebuilt.
+        self._tree = None
+
+        super().__init__(comp_type, group, *fields, **kwargs)
+
+    def _build(self, items, depth=0):
+        """Returns a node: (position, entity, axis, left, right)."""
+        if not items:
+            return None
+
+        axis = depth % len(items[0][1])
+        items.sort(key=lambda item: item[1][axis])
+        median = len(items) // 2
+        entity, position = items[median]
+
+        return (position, entity, axis,
+                self._build(items[:median], depth + 1),
+                self._build(items[median + 1:], depth + 1))
+
+    def _iter_box(self, low, high):
+        if self._tree is None:
+            self._tree = self._build(list(self._index.items()))
+
+        nodes = [self._tree]
+        while nodes:
+            node = nodes.pop()
+            if node is None:
+                continue
+
+            position, entity, axis, left, right = node
+            if in_box(position, low, high):
+                yield entity, position
+
+            if low[axis] <= position[axis]:
+                nodes.append(left)
+            if position[axis] <= high[axis]:
+                nodes.append(right)
+
+    def _add_entity(self, position, entity):
+        self._index[entity] = position
+        self._tree = None
+
+    def _remove_entity(self, position, entity):
+        del self._index[entity]
+        self._tree = None
@@ -1,6 +1,9 @@
+from collections import namedtuple
 from enum import Enum
+from operator import attrgetter
 
 from .utils import Event
+from .columns import ComponentColumns
 from .exceptions import GroupSingleEntity
 
 
@@ -10,6 +13,65 @@ class GroupEvent(Enum):
     ADDED_OR_REMOVED = 3
 
 
+#: Kinds of the entries of the log of a group.
+JOINED = 1
+LEFT = 2
+UPDATED = 3
+
+#: Changes of a group read through a :class:`GroupCursor`.
+GroupDelta = namedtuple('GroupDelta', 'added removed updated')
+
+
+class GroupCursor(object):
+    """Use group.create_cursor() to read the entities which joined, left
+    or got updated in a group since the previous read. An entity which
+    left and joined again is reported as updated.
+    """
+
+    def __init__(self, group, position, initial_entities):
+        self._group = group
+
+        #: Position of the next entry to read in the log of the group.
+        self.position = position
+
+        self._initial_entities = initial_entities
+
+    def read(self):
+        """Returns the changes since the previous read.
+        :rtype: GroupDelta of sets
+        """
+        added = self._initial_entities
+        self._initial_entities = set()
+        removed = set()
+        updated = set()
+
+        for kind, entity in self._group._read_log(self):
+            if kind == UPDATED:
+                if entity not in added:
+                    updated.add(entity)
+            elif kind == JOINED:
+                if entity in removed:
+                    removed.remove(entity)
+                    updated.add(entity)
+                else:
+                    added.add(entity)
+            elif entity in added:
+                added.remove(entity)
+            else:
+                updated.discard(entity)
+                removed.add(entity)
+
+        return GroupDelta(added, removed, updated)
+
+    def close(self):
+        """Stops tracking the changes of the group."""
+        self._group._close_cursor(self)
+
+    def __repr__(self):
+        return '<GroupCursor [{}] at {}>'.format(
+            self._group.matcher, self.position)
+
+
 class Group(object):
     """Use context.get_group(matcher) to get a group of entities which
     match the specified matcher. Calling context.get_group(matcher) with
@@ -29,16 +91,62 @@ class Group(object):
         self.on_entity_removed = Event()
 
         #: Occurs when a component of an entity in the group gets
-        # replaced.
+        #: replaced. This is the replace-aware signal: it carries the
+        #: previous and the new component.
         self.on_entity_updated = Event()
 
+        #: Occurs when an entity joins the group. Unlike
+        #: on_entity_added, it does not occur on replacements.
+        self.on_entity_joined = Event()
+
+        #: Occurs when an entity leaves the group. Unlike
+        #: on_entity_removed, it does not occur on replacements.
+        self.on_entity_left = Event()
+
         self._matcher = matcher
         self._entities = set()
 
+        #: Tuple of the entities ordered by creation index, None when it
+        #: has to be built again.
+        self._snapshot = None
+
+        #: Context to build the entities from on the next read, when the
+        #: group is lazy or got demoted. It is not updated meanwhile.
+        self._context = None
+
+        #: Tells if the entities were read since the context last looked
+        #: for idle groups, and for how many times they were not.
+        self._was_read = False
+        self._idle_count = 0
+
+        #: Log of (kind, entity) shared by the cursors of the group. It
+        #: is only recorded while cursors are open, and entries read by
+        #: all of them get dropped.
+        self._log = []
+
+        #: Position of the first entry of the log.
+        self._log_start = 0
+
+        self._cursors = []
+
     @property
     def entities(self):
+        if self._context is not None:
+            self._context._materialize_group(self)
+        self._was_read = True
         return self._entities
 
+    @property
+    def is_materialized(self):
+        """Tells if the group is kept up to date, which lazy and demoted
+        groups are not until their entities get read.
+        """
+        return self._context is None
+
+    @property
+    def matcher(self):
+        return self._matcher
+
     @property
     def single_entity(self):
         """Returns the only entity in this group.
@@ -46,16 +154,104 @@ class Group(object):
         It will throw a :class:`MissingComponent` if the group has more
         than one entity.
         """
-        count = len(self._entities)
+        entities = self.entities
+        count = len(entities)
 
         if count == 1:
-            return min(self._entities)
+            return next(iter(entities))
         if count == 0:
             return None
 
         raise GroupSingleEntity(
-            'Cannot get a single entity from a group containing {} entities.',
-            len(self._entities))
+            'Cannot get a single entity from a group containing {} '
+            'entities.'.format(count))
+
+    def get_entities_snapshot(self):
+        """Returns the entities ordered by creation index. The tuple is
+        cached until an entity joins or leaves the group, so it can be
+        iterated while changing the entities, every frame, for free.
+        :rtype: tuple
+        """
+        entities = self.entities
+        if self._snapshot is None:
+            self._snapshot = tuple(
+                sorted(entities, key=attrgetter('creation_index')))
+        return self._snapshot
+
+    def columns(self, *comp_types):
+        """Gathers the fields of some component types of the entities of
+        the group into columns. See :class:`ComponentColumns`.
+        :param comp_types: namedtuple types
+        :rtype: ComponentColumns
+        """
+        return ComponentColumns(self.entities, comp_types)
+
+    def create_cursor(self, include_existing=False):
+        """Creates a cursor reading the changes of the group from now
+        on. See :class:`GroupCursor`.
+        :param include_existing: (optional) bool, report the entities
+            already in the group as added on the first read
+        :rtype: GroupCursor
+        """
+        entities = self.entities
+
+        if not self._cursors:
+            self.on_entity_joined += self._log_joined
+            self.on_entity_left += self._log_left
+            self.on_entity_updated += self._log_updated
+
+        cursor = GroupCursor(
+            self, self._log_start + len(self._log),
+            set(entities) if include_existing else set())
+        self._cursors.append(cursor)
+        return cursor
+
+    def _read_log(self, cursor):
+        """Returns the entries not read by the cursor yet, then drops the
+        entries read by all the cursors.
+        """
+        entries = self._log[cursor.position - self._log_start:]
+        cursor.position = self._log_start + len(self._log)
+        self._compact_log()
+        return entries
+
+    def _compact_log(self):
+        if self._cursors:
+            position = min([cursor.position for cursor in self._cursors])
+        else:
+            position = self._log_start + len(self._log)
+
+        if position > self._log_start:
+            del self._log[:position - self._log_start]
+            self._log_start = position
+
+    def _close_cursor(self, cursor):
+        if cursor not in self._cursors:
+            return
+
+        self._cursors.remove(cursor)
+        self._compact_log()
+
+        if not self._cursors:
+            self.on_entity_joined -= self._log_joined
+            self.on_entity_left -= self._log_left
+            self.on_entity_updated -= self._log_updated
+
+    def has_listeners(self):
+        return bool(len(self.on_entity_added) or
+                    len(self.on_entity_removed) or
+                    len(self.on_entity_updated) or
+                    len(self.on_entity_joined) or
+                    len(self.on_entity_left))
+
+    def _log_joined(self, entity, component):
+        self._log.append((JOINED, entity))
+
+    def _log_left(self, entity, component):
+        self._log.append((LEFT, entity))
+
+    def _log_updated(self, entity, previous_comp, new_comp):
+        self._log.append((UPDATED, entity))
 
     def handle_entity_silently(self, entity):
         """This is used by the context to manage the group.
@@ -77,6 +273,8 @@ class Group(object):
 
     def update_entity(self, entity, previous_comp, new_comp):
         """This is used by the context to manage the group.
+        on_entity_removed and on_entity_added are also fired on
+        replacements, for listeners which are not replace-aware.
         :param matcher: Entity
         """
         if entity in self._entities:
@@ -84,9 +282,46 @@ class Group(object):
             self.on_entity_added(entity, new_comp)
             self.on_entity_updated(entity, previous_comp, new_comp)
 
+    def update_entities(self, changes):
+        """This is used by the context to manage the group.
+        :param changes: sequence of (entity, previous_comp, new_comp)
+        """
+        entities = self._entities
+        for entity, previous_comp, new_comp in changes:
+            if entity in entities:
+                self.on_entity_removed(entity, previous_comp)
+                self.on_entity_added(entity, new_comp)
+                self.on_entity_updated(entity, previous_comp, new_comp)
+
+    def add_entities(self, changes):
+        """This is used by the context to manage the group.
+        :param changes: sequence of (entity, component), the component
+            being the one which made the entity match
+        """
+        entities = self._entities
+        for entity, component in changes:
+            if entity not in entities:
+                entities.add(entity)
+                self._snapshot = None
+                self.on_entity_added(entity, component)
+                self.on_entity_joined(entity, component)
+
+    def remove_entities(self, changes):
+        """This is used by the context to manage the group.
+        :param changes: sequence of (entity, component)
+        """
+        entities = self._entities
+        for entity, component in changes:
+            if entity in entities:
+                entities.remove(entity)
+                self._snapshot = None
+                self.on_entity_removed(entity, component)
+                self.on_entity_left(entity, component)
+
     def _add_entity_silently(self, entity):
         if entity not in self._entities:
             self._entities.add(entity)
+            self._snapshot = None
             return True
         return False
 
@@ -94,10 +329,12 @@ class Group(object):
         entity_added = self._add_entity_silently(entity)
         if entity_added:
             self.on_entity_added(entity, component)
+            self.on_entity_joined(entity, component)
 
     def _remove_entity_silently(self, entity):
         if entity in self._entities:
             self._entities.remove(entity)
+            self._snapshot = None
             return True
         return False
 
@@ -105,6 +342,7 @@ class Group(object):
         entity_removed = self._remove_entity_silently(entity)
         if entity_removed:
             self.on_entity_removed(entity, component)
+            self.on_entity_left(entity, component)
 
     def __repr__(self):
         return '<Group [{}]>'.format(self._matcher)
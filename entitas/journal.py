@@ -0,0 +1,244 @@
+"""
+entitas.journal
+~~~~~~~~~~~~~~~
+A change journal records the changes of a context as compact
+(kind, entity id, component) records, the entity id being the creation
+index. Records go into a bounded ring buffer, read in batches by any
+number of readers. Batches can be streamed with an async generator, or
+written to a file as length-prefixed frames, and replayed against
+another context to reproduce its state.
+
+    journal = ChangeJournal(context)
+    reader = journal.create_reader()
+
+    with open('changes.journal', 'wb') as f:
+        write_frame(f, reader.read())
+
+    with open('changes.journal', 'rb') as f:
+        replica = Context()
+        entities = {}
+        for records in read_frames(f):
+            replay(replica, records, entities)
+"""
+
+import asyncio
+import pickle
+import struct
+
+from .component import copy_component
+from .exceptions import EntitasException
+
+#: Kinds of records. The component of a REMOVED record is the removed
+#: one, the component of CREATED and DESTROYED records is None.
+CREATED = 1
+DESTROYED = 2
+ADDED = 3
+REPLACED = 4
+REMOVED = 5
+
+#: Size of the frames written to files.
+FRAME_SIZE = struct.Struct('<I')
+
+
+class ChangeJournal(object):
+    """Records the changes of a context into a ring buffer holding the
+    latest records. A reader which falls behind by more than the
+    capacity misses records: reading then raises an exception.
+    :param context: Context
+    :param capacity: (optional) number of records kept
+    :param include_existing: (optional) bool, starts with the creation
+        of the entities already in the context, to replay the journal
+        against an empty context
+    """
+
+    def __init__(self, context, capacity=1 << 16, include_existing=False):
+        self._context = context
+        self._capacity = capacity
+        self._records = [None] * capacity
+
+        #: Position of the next record, counted from the first record.
+        self.end = 0
+
+        self.closed = False
+
+        if include_existing:
+            for entity in context.entities:
+                self._on_entity_created(entity)
+                for comp in entity.get_components():
+                    self._on_component_added(entity, comp)
+
+        context.on_entity_created += self._on_entity_created
+        context.on_entity_destroyed += self._on_entity_destroyed
+        context.on_component_added += self._on_component_added
+        context.on_component_removed += self._on_component_removed
+        context.on_component_replaced += self._on_component_replaced
+
+    @property
+    def start(self):
+        """Position of the oldest record still in the buffer."""
+        return max(self.end - self._capacity, 0)
+
+    def create_reader(self, from_start=False):
+        """Creates a reader of the records from now on.
+        :param from_start: (optional) bool, read the records still in
+            the buffer too
+        :rtype: JournalReader
+        """
+        return JournalReader(self, self.start if from_start else self.end)
+
+    def get_records(self, start, stop):
+        """Returns the records between two positions, which must still be
+        in the buffer.
+        :rtype: list
+        """
+        capacity = self._capacity
+        first = start % capacity
+        last = first + stop - start
+        if last <= capacity:
+            return self._records[first:last]
+        return self._records[first:] + self._records[:last - capacity]
+
+    def close(self):
+        """Stops recording. Streams end once they read every record."""
+        context = self._context
+        context.on_entity_created -= self._on_entity_created
+        context.on_entity_destroyed -= self._on_entity_destroyed
+        context.on_component_added -= self._on_component_added
+        context.on_component_removed -= self._on_component_removed
+        context.on_component_replaced -= self._on_component_replaced
+        self.closed = True
+
+    def _record(self, record):
+        self._records[self.end % self._capacity] = record
+        self.end += 1
+
+    def _on_entity_created(self, entity):
+        self._record((CREATED, entity.creation_index, None))
+
+    def _on_entity_destroyed(self, entity):
+        self._record((DESTROYED, entity.creation_index, None))
+
+    def _on_component_added(self, entity, comp):
+        self._record((ADDED, entity.creation_index, copy_component(comp)))
+
+    def _on_component_removed(self, entity, comp):
+        self._record((REMOVED, entity.creation_index, copy_component(comp)))
+
+    def _on_component_replaced(self, entity, previous_comp, new_comp):
+        self._record((REPLACED, entity.creation_index,
+                      copy_component(new_comp)))
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return '<ChangeJournal ({}/{})>'.format(len(self), self._capacity)
+
+
+class JournalReader(object):
+    """Reads the records of a journal in batches. Readers are
+    independent from each other.
+    """
+
+    def __init__(self, journal, position):
+        self._journal = journal
+
+        #: Position of the next record to read.
+        self.position = position
+
+    def read(self, max_count=None):
+        """Returns the records since the previous read.
+        :param max_count: (optional) maximum number of records
+        :rtype: list
+        """
+        journal = self._journal
+        if self.position < journal.start:
+            raise EntitasException(
+                'The reader missed {} records of the journal.'.format(
+                    journal.start - self.position),
+                'Read more often, or increase the journal capacity.')
+
+        stop = journal.end
+        if max_count is not None:
+            stop = min(stop, self.position + max_count)
+
+        records = journal.get_records(self.position, stop)
+        self.position = stop
+        return records
+
+    async def stream(self, max_count=None, poll_interval=0.01):
+        """Yields batches of records as they get recorded, until the
+        journal gets closed.
+        :param max_count: (optional) maximum number of records per batch
+        :param poll_interval: (optional) seconds to wait for records
+        """
+        while True:
+            records = self.read(max_count)
+            if records:
+                yield records
+            elif self._journal.closed:
+                return
+            else:
+                await asyncio.sleep(poll_interval)
+
+    def __len__(self):
+        """Number of records not read yet."""
+        return self._journal.end - self.position
+
+    def __repr__(self):
+        return '<JournalReader at {}>'.format(self.position)
+
+
+def write_frame(file, records):
+    """Writes a batch of records to a binary file, prefixed with its
+    size. Component types are pickled by reference: they must be
+    importable where the frames get read.
+    :param file: binary file
+    :param records: list of records
+    """
+    data = pickle.dumps(records, pickle.HIGHEST_PROTOCOL)
+    file.write(FRAME_SIZE.pack(len(data)))
+    file.write(data)
+
+
+def read_frames(file):
+    """Yields the batches of records written to a binary file."""
+    while True:
+        header = file.read(FRAME_SIZE.size)
+        if not header:
+            return
+
+        size, = FRAME_SIZE.unpack(header)
+        data = file.read(size)
+        if len(data) < size:
+            raise EntitasException(
+                'Truncated journal frame.',
+                'The file may still be being written.')
+        yield pickle.loads(data)
+
+
+def replay(context, records, entities=None):
+    """Applies records to a context. Pass the same dictionary of
+    entities to replay consecutive batches.
+    :param context: Context
+    :param records: iterable of records
+    :param entities: (optional) dictionary mapping entity ids and the
+        entities of the context
+    :rtype: dict
+    """
+    if entities is None:
+        entities = {}
+
+    for kind, entity_id, comp in records:
+        if kind == CREATED:
+            entities[entity_id] = context.create_entity()
+        elif kind == DESTROYED:
+            context.destroy_entity(entities.pop(entity_id))
+        elif kind == ADDED:
+            entities[entity_id].add(type(comp), *comp)
+        elif kind == REPLACED:
+            entities[entity_id].replace(type(comp), *comp)
+        else:
+            entities[entity_id].remove(type(comp))
+
+    return entities
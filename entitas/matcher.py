@@ -1,20 +1,58 @@
+from .component_registry import get_mask
+
+
 def get_expr_repr(expr):
-    return '' if expr is None else ','.join([x.__name__ for x in expr])
+    return ','.join(sorted([x.__name__ for x in expr]))
 
 
 class Matcher(object):
+    """Matchers are compared by the component types they use, not by
+    identity: two matchers built from the same types in any order are
+    equal and share the same hash, so they fetch the same group from
+    the context.
+    """
 
     def __init__(self, *args, **kwargs):
-        self._all = args if args else kwargs.get('all_of', None)
-        self._any = kwargs.get('any_of', None)
-        self._none = kwargs.get('none_of', None)
+        self._all = frozenset(args if args else kwargs.get('all_of', ()))
+        self._any = frozenset(kwargs.get('any_of', ()))
+        self._none = frozenset(kwargs.get('none_of', ()))
+        self._hash = hash((self._all, self._any, self._none))
+
+        self._all_mask = get_mask(tuple(self._all))
+        self._any_mask = get_mask(tuple(self._any))
+        self._none_mask = get_mask(tuple(self._none))
 
     def matches(self, entity):
-        all_cond = self._all is None or entity.has(*self._all)
-        any_cond = self._any is None or entity.has_any(*self._any)
-        none_cond = self._none is None or not entity.has_any(*self._none)
+        return self.matches_signature(entity._signature)
+
+    def matches_signature(self, signature):
+        """Checks a component signature against the matcher masks.
+        :param signature: int
+        :rtype: bool
+        """
+        return (signature & self._all_mask == self._all_mask and
+                (not self._any_mask or signature & self._any_mask != 0) and
+                signature & self._none_mask == 0)
+
+    @property
+    def comp_types(self):
+        """Every component type mentioned by this matcher, whatever the
+        condition it is used in.
+        :rtype: frozenset
+        """
+        return self._all | self._any | self._none
+
+    def __eq__(self, other):
+        if not isinstance(other, Matcher):
+            return NotImplemented
+
+        return (self._hash == other._hash and
+                self._all == other._all and
+                self._any == other._any and
+                self._none == other._none)
 
-        return all_cond and any_cond and none_cond
+    def __hash__(self):
+        return self._hash
 
     def __repr__(self):
         return '<Matcher [all=({}) any=({}) none=({})]>'.format(
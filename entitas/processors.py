@@ -1,6 +1,63 @@
 from abc import ABCMeta, abstractmethod
 
-from .collector import Collector
+from concurrent.futures import wait
+
+from .collector import Collector, ChangeCollector, Change
+from .command_buffer import running
+
+
+def conflicts(processor, other):
+    """Tells if two execute processors must not run at the same time:
+    one of them writes a component type the other reads or writes.
+    """
+    if None in (processor.reads, processor.writes,
+                other.reads, other.writes):
+        return True
+
+    writes = set(processor.writes)
+    other_writes = set(other.writes)
+    return bool(writes & (set(other.reads) | other_writes) or
+                other_writes & set(processor.reads))
+
+
+def get_name(processor):
+    return getattr(processor, 'name', None) or type(processor).__name__
+
+
+def get_stages(processors):
+    """Splits execute processors in stages. A processor goes in the
+    stage following the last one holding an earlier processor it
+    conflicts with, so the processors of a stage are independent and
+    conflicting processors keep their order.
+    :param processors: list of ExecuteProcessor
+    :rtype: list of lists
+    """
+    stages = []
+    levels = []
+
+    for processor in processors:
+        level = 0
+        for other, other_level in zip(processors, levels):
+            if other_level >= level and conflicts(processor, other):
+                level = other_level + 1
+        levels.append(level)
+
+        if level == len(stages):
+            stages.append([])
+        stages[level].append(processor)
+
+    return stages
+
+
+def run_as(processor, method):
+    """Calls a method of a processor in a parallel stage, telling the
+    command buffers which processor records into them.
+    """
+    running.processor = processor
+    try:
+        method()
+    finally:
+        running.processor = None
 
 
 class InitializeProcessor(metaclass=ABCMeta):
@@ -10,6 +67,13 @@ class InitializeProcessor(metaclass=ABCMeta):
 
 
 class ExecuteProcessor(metaclass=ABCMeta):
+
+    #: Component types the processor reads and writes. Processors which
+    #: do not conflict may run in parallel. None means unknown: the
+    #: processor never runs along with other ones.
+    reads = None
+    writes = None
+
     @abstractmethod
     def execute(self):
         pass
@@ -78,14 +142,90 @@ class ReactiveProcessor(ExecuteProcessor):
         return collector
 
 
+class BatchReactiveProcessor(ReactiveProcessor):
+    """Reactive processor receiving the changes grouped by trigger
+    matcher: react() gets a dictionary of matchers mapping lists of
+    :class:`Change`, in collection order, one per entity and type of
+    component changed. An entity collected by several triggers is
+    filtered once. Override filter_batch() to filter all the entities
+    in one call, such as with NumPy.
+    """
+
+    def filter(self, entity):
+        return True
+
+    def filter_batch(self, entities):
+        """Returns, for each entity, whether to react to its changes.
+        :param entities: list of Entity
+        :rtype: sequence of bool
+        """
+        return [self.filter(entity) for entity in entities]
+
+    def execute(self):
+        changes = self._collector.changes
+        entities = {}
+        for entity_changes in changes.values():
+            entities.update(entity_changes)
+        if not entities:
+            return
+
+        entities = list(entities)
+        kept = {entity for entity, keep
+                in zip(entities, self.filter_batch(entities)) if keep}
+
+        batches = {}
+        for matcher, entity_changes in changes.items():
+            batch = [Change(entity, previous_comp, new_comp)
+                     for entity, comp_changes in entity_changes.items()
+                     if entity in kept
+                     for previous_comp, new_comp in comp_changes.values()]
+            if batch:
+                batches[matcher] = batch
+
+        self._collector.clear_collected_entities()
+
+        if batches:
+            self.react(batches)
+
+    def _get_collector(self, context):
+        trigger = self.get_trigger()
+        collector = ChangeCollector()
+
+        for matcher in trigger:
+            collector.add(context.get_group(matcher), trigger[matcher])
+
+        return collector
+
+
 class Processors(InitializeProcessor, ExecuteProcessor,
                  CleanupProcessor, TearDownProcessor):
-
-    def __init__(self):
+    """Runs processors in stages of independent execute processors.
+    Without an executor, the processors of a stage run one after the
+    other. With a concurrent.futures executor, such as a
+    ThreadPoolExecutor, they run at the same time: they must then record
+    their changes into their own command buffer instead of applying
+    them. Command buffers are flushed once all the execute processors
+    have run, in the order they were added, as without stages, so
+    results do not depend on the executor.
+    """
+
+    def __init__(self, executor=None, name=None):
         self._initialize_processors = []
         self._execute_processors = []
         self._cleanup_processors = []
         self._tear_down_processors = []
+        self._command_buffers = []
+        self._executor = executor
+        self.name = name
+
+        #: Profiler measuring the processors, and names of the
+        #: enclosing processors.
+        self._profiler = None
+        self._path = ()
+
+        #: Stages of the execute processors, None when they have to be
+        #: computed again.
+        self._stages = None
 
     def add(self, processor):
         if isinstance(processor, InitializeProcessor):
@@ -93,6 +233,7 @@ class Processors(InitializeProcessor, ExecuteProcessor,
 
         if isinstance(processor, ExecuteProcessor):
             self._execute_processors.append(processor)
+            self._stages = None
 
         if isinstance(processor, CleanupProcessor):
             self._cleanup_processors.append(processor)
@@ -100,22 +241,115 @@ class Processors(InitializeProcessor, ExecuteProcessor,
         if isinstance(processor, TearDownProcessor):
             self._tear_down_processors.append(processor)
 
+        if isinstance(processor, Processors) and self._profiler:
+            processor.set_profiler(
+                self._profiler, self._path + (get_name(processor),))
+
+    def add_command_buffer(self, command_buffer):
+        """Registers a command buffer to flush once all the execute
+        processors have run.
+        :param command_buffer: CommandBuffer
+        """
+        self._command_buffers.append(command_buffer)
+
+    def set_profiler(self, profiler, path=()):
+        """Measures the processors, nested ones included, with a
+        profiler. Set None to stop measuring.
+        :param profiler: Profiler
+        :param path: (optional) names of the enclosing processors
+        """
+        self._profiler = profiler
+        self._path = path
+
+        for processor in set(self._initialize_processors +
+                             self._execute_processors +
+                             self._cleanup_processors +
+                             self._tear_down_processors):
+            if isinstance(processor, Processors):
+                processor.set_profiler(
+                    profiler, path + (get_name(processor),))
+
+    @property
+    def stages(self):
+        if self._stages is None:
+            self._stages = get_stages(self._execute_processors)
+        return self._stages
+
     def initialize(self):
+        if self._profiler is not None:
+            return self._measure('initialize', self._initialize_processors)
+
         for processor in self._initialize_processors:
             processor.initialize()
 
     def execute(self):
-        for processor in self._execute_processors:
-            processor.execute()
+        for stage in self.stages:
+            if self._profiler is None:
+                methods = [processor.execute for processor in stage]
+            else:
+                methods = [self._get_measured('execute', processor)
+                           for processor in stage]
+
+            if self._executor is None or len(stage) == 1:
+                for method in methods:
+                    method()
+            else:
+                self._run_parallel(stage, methods)
+
+        for command_buffer in self._command_buffers:
+            command_buffer.flush()
+
+    def _run_parallel(self, stage, methods):
+        """Runs the processors of a stage on the executor. A command
+        buffer recorded into by several of them raises an exception.
+        """
+        for command_buffer in self._command_buffers:
+            command_buffer._claims = {}
+
+        try:
+            futures = [self._executor.submit(run_as, processor, method)
+                       for processor, method in zip(stage, methods)]
+            wait(futures)
+            for future in futures:
+                future.result()
+        finally:
+            for command_buffer in self._command_buffers:
+                command_buffer._claims = None
 
     def cleanup(self):
+        if self._profiler is not None:
+            return self._measure('cleanup', self._cleanup_processors)
+
         for processor in self._cleanup_processors:
             processor.cleanup()
 
     def tear_down(self):
+        if self._profiler is not None:
+            return self._measure('tear_down', self._tear_down_processors)
+
         for processor in self._tear_down_processors:
             processor.tear_down()
 
+    def _measure(self, phase, processors):
+        for processor in processors:
+            self._get_measured(phase, processor)()
+
+    def _get_measured(self, phase, processor):
+        """Returns a function calling the method of a processor for a
+        phase under the profiler.
+        """
+        profiler = self._profiler
+        path = (phase,) + self._path + (get_name(processor),)
+        method = getattr(processor, phase)
+
+        def measured():
+            if isinstance(processor, ReactiveProcessor):
+                profiler.count('collected_entities', len(
+                    processor._collector.collected_entities))
+            profiler.measure(path, method)
+
+        return measured
+
     def activate_reactive_processors(self):
         for processor in self._execute_processors:
             if isinstance(processor, ReactiveProcessor):
@@ -126,7 +360,7 @@ class Processors(InitializeProcessor, ExecuteProcessor,
 
     def deactivate_reactive_processors(self):
         for processor in self._execute_processors:
-            if issubclass(processor, ReactiveProcessor):
+            if isinstance(processor, ReactiveProcessor):
                 processor.deactivate()
 
             if isinstance(processor, Processors):
@@ -134,7 +368,7 @@ class Processors(InitializeProcessor, ExecuteProcessor,
 
     def clear_reactive_processors(self):
         for processor in self._execute_processors:
-            if issubclass(processor, ReactiveProcessor):
+            if isinstance(processor, ReactiveProcessor):
                 processor.clear()
 
             if isinstance(processor, Processors):
@@ -0,0 +1,189 @@
+"""
+entitas.profiler
+~~~~~~~~~~~~~~~~
+Opt-in instrumentation: a profiler measures the wall time of every
+processor run by :class:`Processors`, and counts the events of the
+contexts it watches. Nothing is measured or counted until a profiler
+is set, so it costs nothing otherwise.
+
+    profiler = Profiler()
+    processors.set_profiler(profiler)
+    profiler.watch(context)
+
+    processors.execute()
+    print(profiler.as_dict())
+    print(profiler.to_folded())  # input of flamegraph.pl or speedscope
+"""
+
+from collections import deque
+from time import perf_counter
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = int(round(percent / 100 * (len(sorted_values) - 1)))
+    return sorted_values[rank]
+
+
+class ProcessorStats(object):
+    """Wall times of a processor, in seconds. Percentiles are computed
+    from the latest samples only.
+    """
+
+    def __init__(self, sample_count=1000):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=sample_count)
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.samples.append(duration)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self):
+        samples = sorted(self.samples)
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'p50': percentile(samples, 50),
+            'p99': percentile(samples, 99),
+        }
+
+    def __repr__(self):
+        return '<ProcessorStats ({} calls, {:.6f}s)>'.format(
+            self.count, self.total)
+
+
+class Profiler(object):
+
+    def __init__(self, sample_count=1000):
+        self._sample_count = sample_count
+
+        #: Dictionary mapping paths, tuples of the phase and of the
+        #: names of the nested processors, and their stats.
+        self.stats = {}
+
+        #: Dictionary mapping counter names and their values.
+        self.counters = {}
+
+        self._contexts = []
+        self._groups = []
+
+    def measure(self, path, method):
+        """Calls a method of a processor and records its wall time.
+        :param path: tuple of str
+        :param method: callable
+        """
+        start = perf_counter()
+        try:
+            method()
+        finally:
+            duration = perf_counter() - start
+            stats = self.stats.get(path)
+            if stats is None:
+                stats = self.stats[path] = ProcessorStats(
+                    self._sample_count)
+            stats.add(duration)
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def watch(self, context):
+        """Counts the entities created and destroyed, the components
+        added, replaced and removed, and the entities joining, leaving
+        and updated in the groups of a context.
+        :param context: Context
+        """
+        self._contexts.append(context)
+        context.on_entity_created += self._on_entity_created
+        context.on_entity_destroyed += self._on_entity_destroyed
+        context.on_component_added += self._on_component_added
+        context.on_component_removed += self._on_component_removed
+        context.on_component_replaced += self._on_component_replaced
+        context.on_group_created += self._watch_group
+
+        for group in context.groups:
+            self._watch_group(group)
+
+    def unwatch(self):
+        for context in self._contexts:
+            context.on_entity_created -= self._on_entity_created
+            context.on_entity_destroyed -= self._on_entity_destroyed
+            context.on_component_added -= self._on_component_added
+            context.on_component_removed -= self._on_component_removed
+            context.on_component_replaced -= self._on_component_replaced
+            context.on_group_created -= self._watch_group
+
+        for group in self._groups:
+            group.on_entity_joined -= self._on_group_joined
+            group.on_entity_left -= self._on_group_left
+            group.on_entity_updated -= self._on_group_updated
+
+        self._contexts.clear()
+        self._groups.clear()
+
+    def reset(self):
+        self.stats.clear()
+        self.counters.clear()
+
+    def as_dict(self):
+        return {
+            'processors': {';'.join(path): stats.as_dict()
+                           for path, stats in self.stats.items()},
+            'counters': dict(self.counters),
+        }
+
+    def to_folded(self):
+        """Returns the stats in the folded stacks format: one line per
+        path, with its own time in microseconds, that is without the
+        time of its nested processors.
+        :rtype: str
+        """
+        own_times = {path: stats.total for path, stats in self.stats.items()}
+        for path, stats in self.stats.items():
+            if path[:-1] in own_times:
+                own_times[path[:-1]] -= stats.total
+
+        return '\n'.join([
+            '{} {}'.format(';'.join(path), max(int(own_time * 1e6), 0))
+            for path, own_time in sorted(own_times.items())])
+
+    def _watch_group(self, group):
+        self._groups.append(group)
+        group.on_entity_joined += self._on_group_joined
+        group.on_entity_left += self._on_group_left
+        group.on_entity_updated += self._on_group_updated
+
+    def _on_entity_created(self, entity):
+        self.count('entities_created')
+
+    def _on_entity_destroyed(self, entity):
+        self.count('entities_destroyed')
+
+    def _on_component_added(self, entity, comp):
+        self.count('components_added')
+
+    def _on_component_removed(self, entity, comp):
+        self.count('components_removed')
+
+    def _on_component_replaced(self, entity, previous_comp, new_comp):
+        self.count('components_replaced')
+
+    def _on_group_joined(self, entity, comp):
+        self.count('group_entities_added')
+
+    def _on_group_left(self, entity, comp):
+        self.count('group_entities_removed')
+
+    def _on_group_updated(self, entity, previous_comp, new_comp):
+        self.count('group_entities_updated')
+
+    def __repr__(self):
+        return '<Profiler ({} processors)>'.format(len(self.stats))
@@ -0,0 +1,465 @@
+"""
+entitas.sharding
+~~~~~~~~~~~~~~~~
+A sharded context partitions its entities across worker processes.
+Each worker owns a context and runs its own processors. The
+coordinator, in the main process, gives every entity a global id,
+routes component changes to the shard owning the entity and moves the
+entities whose shard key changed to their new shard.
+
+Batches are pickled into shared memory segments owned by their sender:
+the pipe between the coordinator and a worker only carries the name of
+the segment and the size of the batch.
+
+    def get_cell(comps):
+        return int(comps[Position].x // 100)
+
+    def setup(context):
+        processors = Processors()
+        processors.add(Move(context))
+        return processors
+
+    with ShardedContext(4, get_cell, setup) as context:
+        context.create_entity(Position(0, 0), Movable())
+        context.execute()
+
+The key function and the setup function are called in the workers:
+with the 'spawn' and 'forkserver' start methods, they must be defined
+at the top level of a module, like the component types.
+
+Processors may create and destroy entities in their shard. The workers
+report them to the coordinator, which gives the created entities a
+global id when it next sends changes to their shard, as execute() does.
+"""
+
+import multiprocessing
+import pickle
+import traceback
+from collections import namedtuple
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from .context import Context
+from .entity_index import PrimaryEntityIndex
+from .matcher import Matcher
+from .exceptions import EntitasException
+
+#: Component holding the global id of an entity in its shard.
+GlobalId = namedtuple('GlobalId', 'id')
+
+#: Commands applied by a shard.
+CREATE = 1
+ADD = 2
+REPLACE = 3
+REMOVE = 4
+DESTROY = 5
+ASSIGN = 6
+
+#: Messages sent to a worker.
+APPLY = 1
+EXECUTE = 2
+ENTITIES = 3
+STOP = 4
+
+
+class BatchChannel(object):
+    """Sends pickled batches through a shared memory segment owned by
+    the sender, grown when a batch does not fit. A batch must be
+    received before the next one is sent on the same channel.
+    """
+
+    def __init__(self, connection, capacity=1 << 20):
+        self._connection = connection
+        self._capacity = capacity
+        self._outbox = None
+        self._inbox = None
+
+    def send(self, batch):
+        data = pickle.dumps(batch, pickle.HIGHEST_PROTOCOL)
+
+        if self._outbox is None or self._outbox.size < len(data):
+            self._close_outbox()
+            self._capacity = max(self._capacity, len(data))
+            self._outbox = SharedMemory(create=True, size=self._capacity)
+
+        self._outbox.buf[:len(data)] = data
+        self._connection.send((self._outbox.name, len(data)))
+
+    def receive(self):
+        name, size = self._connection.recv()
+
+        if self._inbox is None or self._inbox.name != name:
+            self._close_inbox()
+            self._inbox = SharedMemory(name=name)
+
+        return pickle.loads(self._inbox.buf[:size])
+
+    def close(self):
+        self._close_inbox()
+        self._close_outbox()
+        self._connection.close()
+
+    def _close_inbox(self):
+        if self._inbox is not None:
+            self._inbox.close()
+            self._inbox = None
+
+    def _close_outbox(self):
+        if self._outbox is not None:
+            self._outbox.close()
+            self._outbox.unlink()
+            self._outbox = None
+
+
+class Shard(object):
+    """State of a worker: its context, its processors, and the entities
+    changed since their shard was last checked.
+    """
+
+    def __init__(self, shard, shard_count, get_key, setup):
+        self._shard = shard
+        self._shard_count = shard_count
+        self._get_key = get_key
+
+        self.context = Context()
+        self._ids = PrimaryEntityIndex(
+            GlobalId, self.context.get_group(Matcher(GlobalId)), 'id')
+
+        self._changed = set()
+        self.context.on_component_added += self._on_comp_changed
+        self.context.on_component_removed += self._on_comp_removed
+        self.context.on_component_replaced += self._on_comp_replaced
+
+        #: Handles of the entities created in the shard, which need a
+        #: global id unless they got one from a command.
+        self._created = []
+
+        #: Global ids of the entities destroyed by the processors.
+        self._destroyed = set()
+        self.context.on_entity_created += self._on_entity_created
+
+        self._processors = setup(self.context)
+        self._processors.initialize()
+
+    def apply(self, commands):
+        for command, global_id, comp_type, args in commands:
+            if command == CREATE:
+                entity = self.context.create_entity()
+                entity.add(GlobalId, global_id)
+                for comp in args:
+                    entity.add(type(comp), *comp)
+                continue
+
+            if command == ASSIGN:
+                self.context.resolve(args).add(GlobalId, global_id)
+                continue
+
+            entity = self._ids.get_entity(global_id)
+            if command == ADD:
+                entity.add(comp_type, *args)
+            elif command == REPLACE:
+                entity.replace(comp_type, *args)
+            elif command == REMOVE:
+                entity.remove(comp_type)
+            else:
+                self.context.destroy_entity(entity)
+                self._destroyed.discard(global_id)
+
+        return self.report()
+
+    def execute(self):
+        self._processors.execute()
+        return self.report()
+
+    def get_entities(self):
+        return [(entity.get(GlobalId).id, get_comps(entity))
+                for entity in self.context.entities
+                if entity.has(GlobalId)]
+
+    def report(self):
+        """Moves the entities which belong to another shard, then
+        returns what the coordinator has to know.
+        :rtype: tuple of the migrations, the handles of the created
+            entities and the global ids of the destroyed entities
+        """
+        migrations = self.migrate()
+
+        created = []
+        for handle in self._created:
+            entity = self.context.resolve(handle)
+            if entity is not None and not entity.has(GlobalId):
+                created.append(handle)
+        self._created.clear()
+
+        destroyed = list(self._destroyed)
+        self._destroyed.clear()
+
+        return migrations, created, destroyed
+
+    def migrate(self):
+        """Destroys the entities which belong to another shard. Entities
+        without a global id yet stay until they get one.
+        :rtype: list of (global id, shard, components)
+        """
+        migrations = []
+        changed = [entity for entity in self._changed
+                   if self.context.has_entity(entity) and
+                   entity.has(GlobalId)]
+        self._changed.clear()
+
+        for entity in changed:
+            comps = get_comps(entity)
+            shard = get_shard(self._get_key, comps, self._shard_count,
+                              self._shard)
+            if shard != self._shard:
+                global_id = entity.get(GlobalId).id
+                migrations.append((global_id, shard, comps))
+                self.context.destroy_entity(entity)
+                self._destroyed.discard(global_id)
+
+        return migrations
+
+    def _on_entity_created(self, entity):
+        self._created.append(entity.handle)
+
+    def _on_comp_changed(self, entity, comp):
+        self._changed.add(entity)
+
+    def _on_comp_removed(self, entity, comp):
+        self._changed.add(entity)
+        if type(comp) is GlobalId:
+            self._destroyed.add(comp.id)
+
+    def _on_comp_replaced(self, entity, previous_comp, new_comp):
+        self._changed.add(entity)
+
+
+def get_comps(entity):
+    return [comp for comp in entity.get_components()
+            if type(comp) is not GlobalId]
+
+
+def get_shard(get_key, comps, shard_count, default):
+    """Returns the shard of some components, or the default shard when
+    the key function raises KeyError, as when a component is missing.
+    """
+    try:
+        key = get_key({type(comp): comp for comp in comps})
+    except KeyError:
+        return default
+    return key % shard_count
+
+
+def run_worker(shard, shard_count, get_key, setup, connection):
+    channel = BatchChannel(connection)
+    try:
+        state = Shard(shard, shard_count, get_key, setup)
+        error = None
+    except Exception:
+        error = traceback.format_exc()
+
+    while True:
+        message, payload = channel.receive()
+        if message == STOP:
+            break
+
+        if error is not None:
+            channel.send((False, error))
+            continue
+
+        try:
+            if message == APPLY:
+                result = state.apply(payload)
+            elif message == EXECUTE:
+                result = state.execute()
+            else:
+                result = state.get_entities()
+            channel.send((True, result))
+        except Exception:
+            channel.send((False, traceback.format_exc()))
+
+    channel.close()
+
+
+class ShardedContext(object):
+    """Coordinates a context sharded across worker processes.
+    :param shard_count: number of worker processes
+    :param get_key: function returning an int from a dictionary mapping
+        component types and the components of an entity, such as its
+        spatial cell. The shard of the entity is the key modulo the
+        shard count. When it raises KeyError, for an entity missing a
+        component, the entity stays in its shard, or goes to the shard
+        of its global id modulo the shard count when it gets created.
+    :param setup: function returning the processors of a shard from its
+        context
+    :param start_method: (optional) multiprocessing start method
+    """
+
+    def __init__(self, shard_count, get_key, setup, start_method=None):
+        self._shard_count = shard_count
+        self._get_key = get_key
+
+        #: Dictionary mapping global ids and the shards owning them.
+        self._shards = {}
+        self._next_id = 0
+
+        #: Commands to send to each shard.
+        self._pending = [[] for _ in range(shard_count)]
+
+        # Workers have to share the tracker of the coordinator, which
+        # owns half of the shared memory segments.
+        resource_tracker.ensure_running()
+
+        mp_context = multiprocessing.get_context(start_method)
+        self._processes = []
+        self._channels = []
+
+        for shard in range(shard_count):
+            connection, worker_connection = mp_context.Pipe()
+            process = mp_context.Process(
+                target=run_worker, daemon=True,
+                args=(shard, shard_count, get_key, setup, worker_connection))
+            process.start()
+            worker_connection.close()
+
+            self._processes.append(process)
+            self._channels.append(BatchChannel(connection))
+
+    @property
+    def shard_count(self):
+        return self._shard_count
+
+    def create_entity(self, *comps):
+        """Creates an entity in the shard of its components.
+        :param *comps: components
+        :rtype: int, the global id of the entity
+        """
+        global_id = self._next_id
+        self._next_id += 1
+
+        shard = get_shard(self._get_key, comps, self._shard_count,
+                          global_id % self._shard_count)
+        self._shards[global_id] = shard
+        self._pending[shard].append((CREATE, global_id, None, comps))
+        return global_id
+
+    def add(self, global_id, comp_type, *args):
+        self._record(ADD, global_id, comp_type, args)
+
+    def replace(self, global_id, comp_type, *args):
+        self._record(REPLACE, global_id, comp_type, args)
+
+    def remove(self, global_id, comp_type):
+        self._record(REMOVE, global_id, comp_type, None)
+
+    def destroy_entity(self, global_id):
+        self._record(DESTROY, global_id, None, None)
+        del self._shards[global_id]
+
+    def get_shard(self, global_id):
+        """Returns the shard owning an entity, once pending changes
+        are applied.
+        """
+        self.flush()
+        return self._shards[global_id]
+
+    def flush(self):
+        """Sends the pending changes to their shards, in batches, and
+        moves the entities whose shard changed.
+        """
+        while any(self._pending):
+            pending = self._pending
+            self._pending = [[] for _ in range(self._shard_count)]
+            self._broadcast(APPLY, pending)
+
+    def execute(self):
+        """Runs the processors of every shard at the same time."""
+        self.flush()
+        self._broadcast(EXECUTE, [None] * self._shard_count)
+        self.flush()
+
+    def get_entities(self):
+        """Returns a dictionary mapping the global ids of all the
+        entities and their components.
+        """
+        self.flush()
+        entities = {}
+        for shard_entities in self._broadcast(
+                ENTITIES, [None] * self._shard_count):
+            entities.update(shard_entities)
+        return entities
+
+    def close(self):
+        for channel in self._channels:
+            channel.send((STOP, None))
+        for process in self._processes:
+            process.join()
+        for channel in self._channels:
+            channel.close()
+        self._processes.clear()
+        self._channels.clear()
+
+    def _record(self, command, global_id, comp_type, args):
+        if global_id not in self._shards:
+            raise EntitasException(
+                'Unknown entity {}.'.format(global_id),
+                'It may have been destroyed.')
+
+        shard = self._shards[global_id]
+        self._pending[shard].append((command, global_id, comp_type, args))
+
+    def _broadcast(self, message, payloads):
+        """Sends a message to every shard with a payload, then gathers
+        their results. Entities destroyed in the shards are forgotten,
+        while migrations and global ids for the entities created in the
+        shards are recorded for the next flush.
+        """
+        shards = [shard for shard, payload in enumerate(payloads)
+                  if payload or message != APPLY]
+
+        for shard in shards:
+            self._channels[shard].send((message, payloads[shard]))
+
+        results = []
+        errors = []
+        for shard in shards:
+            succeeded, result = self._channels[shard].receive()
+            if not succeeded:
+                errors.append('Shard {}:\n{}'.format(shard, result))
+            elif message == ENTITIES:
+                results.append(result)
+            else:
+                migrations, created, destroyed = result
+                for global_id in destroyed:
+                    self._shards.pop(global_id, None)
+
+                for global_id, new_shard, comps in migrations:
+                    self._shards[global_id] = new_shard
+                    self._pending[new_shard].append(
+                        (CREATE, global_id, None, comps))
+
+                for handle in created:
+                    global_id = self._next_id
+                    self._next_id += 1
+                    self._shards[global_id] = shard
+                    self._pending[shard].append(
+                        (ASSIGN, global_id, None, handle))
+
+        if errors:
+            raise EntitasException(
+                'Processing failed in a shard.', '\n'.join(errors))
+
+        return results
+
+    def __len__(self):
+        return len(self._shards)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return '<ShardedContext ({} shards, {} entities)>'.format(
+            self._shard_count, len(self))
@@ -0,0 +1,336 @@
+"""
+entitas.snapshot
+~~~~~~~~~~~~~~~~
+Binary snapshots of the entities of a context, laid out column-wise
+per component type. Integer and float columns are stored as raw
+arrays aligned on 8 bytes, so a snapshot can be memory-mapped and its
+columns read without copying. Other columns are pickled.
+
+A full snapshot holds every entity. An incremental snapshot only
+holds the entities created or changed since the previous snapshot
+written by the same :class:`SnapshotWriter`, with all their
+components, and the creation indices of the destroyed entities.
+
+    writer = SnapshotWriter(context)
+    writer.write('base.snap')
+    # later
+    writer.write('delta_1.snap', incremental=True)
+
+    load_snapshots(Context(), ['base.snap', 'delta_1.snap'], comp_types)
+"""
+
+import json
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+
+from .exceptions import EntitasException
+
+MAGIC = b'ENTSNAP1'
+
+#: Header size, written after the magic bytes.
+HEADER_SIZE = struct.Struct('<Q')
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def get_column_kind(values):
+    """Returns the array typecode able to store all the values, or
+    'pickle' when there is none.
+    """
+    if all([type(value) is int and INT64_MIN <= value <= INT64_MAX
+            for value in values]):
+        return 'q'
+    if all([type(value) is float for value in values]):
+        return 'd'
+    return 'pickle'
+
+
+class SnapshotData(object):
+    """Data sections of a snapshot being written, aligned on 8 bytes."""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def add(self, values, kind=None):
+        kind = kind or get_column_kind(values)
+        if kind == 'pickle':
+            data = pickle.dumps(list(values), pickle.HIGHEST_PROTOCOL)
+        else:
+            data = array(kind, values).tobytes()
+
+        section = {'kind': kind, 'offset': self.size, 'size': len(data),
+                   'count': len(values)}
+        padding = -len(data) % 8
+        self.chunks.append(data + b'\0' * padding)
+        self.size += len(data) + padding
+        return section
+
+
+def write_snapshot(path, entities, destroyed_ids=(), incremental=False):
+    """Writes a snapshot of some entities.
+    :param path: str
+    :param entities: iterable of Entity
+    :param destroyed_ids: (optional) creation indices of the entities
+        destroyed since the previous snapshot
+    :param incremental: (optional) bool
+    """
+    data = SnapshotData()
+    entity_ids = []
+    comps_by_type = {}
+
+    for entity in entities:
+        entity_ids.append(entity.creation_index)
+        for comp in entity.get_components():
+            comps_by_type.setdefault(type(comp), ([], []))
+            ids, comps = comps_by_type[type(comp)]
+            ids.append(entity.creation_index)
+            comps.append(comp)
+
+    header = {
+        'incremental': incremental,
+        'byteorder': sys.byteorder,
+        'entities': data.add(entity_ids, 'q'),
+        'destroyed': data.add(list(destroyed_ids), 'q'),
+        'components': [],
+    }
+
+    for comp_type, (ids, comps) in comps_by_type.items():
+        columns = list(zip(*comps)) if comp_type._fields else []
+        header['components'].append({
+            'name': comp_type.__name__,
+            'fields': list(comp_type._fields),
+            'entities': data.add(ids, 'q'),
+            'columns': [data.add(column) for column in columns],
+        })
+
+    header_data = json.dumps(header).encode('utf-8')
+    header_data += b' ' * (-(len(MAGIC) + HEADER_SIZE.size +
+                             len(header_data)) % 8)
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER_SIZE.pack(len(header_data)))
+        f.write(header_data)
+        for chunk in data.chunks:
+            f.write(chunk)
+
+
+class Snapshot(object):
+    """A snapshot file, memory-mapped. Integer and float columns are
+    memoryviews over the file: release them, or close the snapshot,
+    before the file gets replaced.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise EntitasException(
+                '{!r} is not a snapshot.'.format(path),
+                'Snapshots are written by SnapshotWriter.write().')
+
+        start = len(MAGIC) + HEADER_SIZE.size
+        header_size, = HEADER_SIZE.unpack(self._mmap[len(MAGIC):start])
+        self._header = json.loads(
+            self._mmap[start:start + header_size].decode('utf-8'))
+        self._data_offset = start + header_size
+
+        #: Memoryviews exported over the file, released on close.
+        self._views = []
+
+        self._components = {
+            comp['name']: comp for comp in self._header['components']}
+
+    @property
+    def incremental(self):
+        return self._header['incremental']
+
+    @property
+    def entity_ids(self):
+        """Creation indices of the entities held by the snapshot."""
+        return self._read(self._header['entities'])
+
+    @property
+    def destroyed_ids(self):
+        """Creation indices of the entities destroyed since the previous
+        snapshot. Always empty for a full snapshot.
+        """
+        return self._read(self._header['destroyed'])
+
+    @property
+    def component_names(self):
+        return list(self._components)
+
+    def get_fields(self, name):
+        return tuple(self._components[name]['fields'])
+
+    def get_columns(self, name):
+        """Returns the creation indices of the entities having a
+        component, and its columns, one per field.
+        :param name: str, name of the component type
+        :rtype: tuple
+        """
+        comp = self._components[name]
+        return (self._read(comp['entities']),
+                [self._read(column) for column in comp['columns']])
+
+    def _read(self, section):
+        start = self._data_offset + section['offset']
+        stop = start + section['size']
+
+        if section['kind'] == 'pickle':
+            return pickle.loads(self._mmap[start:stop])
+
+        if self._header['byteorder'] != sys.byteorder:
+            values = array(section['kind'], self._mmap[start:stop])
+            values.byteswap()
+            return values
+
+        if not section['size']:
+            return array(section['kind'])
+
+        view = memoryview(self._mmap)
+        data = view[start:stop]
+        column = data.cast(section['kind'])
+        self._views.extend([view, data, column])
+        return column
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return '<Snapshot [{}]{}>'.format(
+            ','.join(self._components),
+            ' incremental' if self.incremental else '')
+
+
+class SnapshotWriter(object):
+    """Writes snapshots of a context. Created, changed and destroyed
+    entities are tracked through the events of the context, so that
+    incremental snapshots only hold what changed since the previous
+    snapshot.
+    """
+
+    def __init__(self, context):
+        self._context = context
+
+        #: Entities created or changed since the previous snapshot.
+        self._changed = set()
+
+        #: Creation indices of the entities destroyed since the
+        #: previous snapshot.
+        self._destroyed = set()
+
+        self.activate()
+
+    def activate(self):
+        context = self._context
+        context.on_entity_created += self._entity_changed
+        context.on_entity_destroyed += self._entity_destroyed
+        context.on_component_added += self._comp_changed
+        context.on_component_removed += self._comp_changed
+        context.on_component_replaced += self._comp_replaced
+
+    def deactivate(self):
+        context = self._context
+        context.on_entity_created -= self._entity_changed
+        context.on_entity_destroyed -= self._entity_destroyed
+        context.on_component_added -= self._comp_changed
+        context.on_component_removed -= self._comp_changed
+        context.on_component_replaced -= self._comp_replaced
+        self._changed.clear()
+        self._destroyed.clear()
+
+    def write(self, path, incremental=False):
+        """Writes a snapshot, then starts tracking changes again.
+        :param path: str
+        :param incremental: (optional) bool, only write the changes
+            since the previous snapshot
+        """
+        if incremental:
+            entities = [entity for entity in self._changed
+                        if self._context.has_entity(entity)]
+            write_snapshot(path, entities, sorted(self._destroyed), True)
+        else:
+            write_snapshot(path, self._context.entities)
+
+        self._changed.clear()
+        self._destroyed.clear()
+
+    def _entity_changed(self, entity):
+        self._changed.add(entity)
+
+    def _entity_destroyed(self, entity):
+        self._changed.discard(entity)
+        self._destroyed.add(entity.creation_index)
+
+    def _comp_changed(self, entity, comp):
+        self._changed.add(entity)
+
+    def _comp_replaced(self, entity, previous_comp, new_comp):
+        self._changed.add(entity)
+
+
+def load_snapshots(context, paths, comp_types):
+    """Restores a full snapshot followed by incremental ones into an
+    empty context. Entities keep their creation index. They are created
+    in bulk, with group membership computed once per set of component
+    types and entity indices updated in one batch per group.
+    :param context: Context
+    :param paths: sequence of str
+    :param comp_types: namedtuple types of the components to restore
+    :rtype: dict mapping creation indices and entities
+    """
+    if context.entities:
+        raise EntitasException(
+            'Cannot restore snapshots into a context having entities.',
+            'Restore them into a new context.')
+
+    types_by_name = {comp_type.__name__: comp_type
+                     for comp_type in comp_types}
+    state = {}
+
+    for path in paths:
+        with Snapshot(path) as snapshot:
+            if not snapshot.incremental:
+                state.clear()
+
+            for entity_id in snapshot.destroyed_ids:
+                state.pop(entity_id, None)
+            for entity_id in snapshot.entity_ids:
+                state[entity_id] = {}
+
+            for name in snapshot.component_names:
+                comp_type = types_by_name.get(name)
+                if (comp_type is None or
+                        comp_type._fields != snapshot.get_fields(name)):
+                    raise EntitasException(
+                        'Unknown component {!r} in {!r}.'.format(name, path),
+                        'Pass its namedtuple type, with the same fields.')
+
+                ids, columns = snapshot.get_columns(name)
+                columns = [column.tolist() if hasattr(column, 'tolist')
+                           else column for column in columns]
+                rows = zip(*columns) if columns else [()] * len(ids)
+                for entity_id, values in zip(ids.tolist(), rows):
+                    state[entity_id][comp_type] = comp_type._make(values)
+
+    return context._restore_entities([
+        (entity_id, list(comps.values()))
+        for entity_id, comps in sorted(state.items())])
@@ -1,19 +1,58 @@
 class Event(object):
-    """C# events in Python."""
+    """C# events in Python.
+
+    Listeners are kept in an insertion-ordered dictionary, so
+    subscribing and unsubscribing are O(1). Dispatching goes through a
+    tuple snapshot of the listeners, rebuilt lazily after changes, with
+    a fast path for the common case of a single listener.
+    """
+
+    __slots__ = ('_listeners', '_snapshot', '_single')
 
     def __init__(self):
-        self._listeners = []
+        self._listeners = {}
+        self._snapshot = ()
+        self._single = None
 
     def __call__(self, *args, **kwargs):
-        for listener in self._listeners:
+        if kwargs:
+            return self._call_with_keywords(args, kwargs)
+
+        single = self._single
+        if single is not None:
+            single(*args)
+            return
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._snapshot = tuple(self._listeners)
+        for listener in snapshot:
+            listener(*args)
+
+    def _call_with_keywords(self, args, kwargs):
+        """Slow path of calls passing keyword arguments."""
+        for listener in tuple(self._listeners):
             listener(*args, **kwargs)
 
     def __add__(self, listener):
         if listener not in self._listeners:
-            self._listeners.append(listener)
+            self._listeners[listener] = None
+            self._changed()
         return self
 
     def __sub__(self, listener):
         if listener in self._listeners:
-            self._listeners.remove(listener)
+            del self._listeners[listener]
+            self._changed()
         return self
+
+    def __contains__(self, listener):
+        return listener in self._listeners
+
+    def __len__(self):
+        return len(self._listeners)
+
+    def _changed(self):
+        self._snapshot = None
+        self._single = (next(iter(self._listeners))
+                        if len(self._listeners) == 1 else None)
@@ -29,5 +29,6 @@ setup(
     url='https://github.com/aenyhm/entitas-python',
     packages=packages,
     install_requires=required,
+    python_requires='>=3.7',
     license='MIT',
 )
@@ -0,0 +1,100 @@
+from array import array
+
+import pytest
+from entitas import (
+    Context, Matcher, ArchetypeStorage, EntityIndex, MissingComponent
+)
+from .test_components import Movable, Position, Person
+
+
+class TestArchetypeStorage(object):
+
+    def test_entity(self):
+        context = Context(ArchetypeStorage({Position: 'd'}))
+        entity = context.create_entity()
+        entity.add(Position, 1, 2)
+        entity.add(Movable)
+
+        assert entity.has(Position, Movable)
+        assert entity.get(Position) == Position(1.0, 2.0)
+        assert set(entity.get_components()) == set([Position(1, 2),
+                                                    Movable()])
+
+        entity.replace(Position, 3, 4)
+        assert entity.get(Position) == Position(3, 4)
+
+        entity.remove(Position)
+        assert not entity.has(Position)
+        with pytest.raises(MissingComponent):
+            entity.get(Position)
+
+        context.destroy_entity(entity)
+        assert entity.get_components() == []
+
+    def test_columns(self):
+        storage = ArchetypeStorage({Position: 'd'})
+        context = Context(storage)
+        entities = [context.create_entity() for _ in range(3)]
+        for i, entity in enumerate(entities):
+            entity.add(Position, i, i * 10)
+        entities[2].add(Movable)
+
+        archetype, = storage.get_archetypes(Matcher(none_of=[Movable]))
+        x, y = archetype.columns[Position]
+        assert isinstance(x, array)
+        assert list(x) == [0, 1] and list(y) == [0, 10]
+
+        context.destroy_entity(entities[0])
+        assert archetype.entities == [entities[1]]
+        assert entities[1].get(Position) == Position(1, 10)
+        assert entities[2].get(Position) == Position(2, 20)
+
+    def test_groups_and_indices(self):
+        context = Context(ArchetypeStorage())
+        group = context.get_group(Matcher(Person))
+        context.add_entity_index(EntityIndex(Person, group, 'age'))
+        adam = context.create_entity()
+        adam.add(Person, 'Adam', 42)
+        eve = context.create_entity()
+        eve.add(Person, 'Eve', 42)
+        eve.replace(Person, 'Eve', 43)
+
+        assert group.entities == set([adam, eve])
+        index = context.get_entity_index(Person)
+        assert index.get_entities(42) == set([adam])
+        assert index.get_entities(43) == set([eve])
+
+    def test_bulk(self):
+        storage = ArchetypeStorage({Position: 'd'})
+        context = Context(storage)
+        group = context.get_group(Matcher(Position, Movable))
+        entities = context.create_entities(3, [(Position, 1, 2), (Movable,)])
+
+        archetype, = storage.get_archetypes(Matcher(Position))
+        assert archetype.entities == entities
+        assert group.entities == set(entities)
+
+        context.destroy_entities(entities[:2])
+        assert archetype.entities == entities[2:]
+        assert entities[2].get(Position) == Position(1, 2)
+        assert group.entities == set(entities[2:])
+
+    def test_rejected_values(self):
+        storage = ArchetypeStorage({Position: 'd', Person: 'q'})
+        context = Context(storage)
+        entities = [context.create_entity() for _ in range(3)]
+        for i, entity in enumerate(entities):
+            entity.add(Position, i, i * 10)
+
+        with pytest.raises(TypeError):
+            entities[0].add(Person, 'Adam', 42)
+        with pytest.raises(TypeError):
+            entities[1].replace(Position, 5, 'a')
+
+        archetype, = storage.get_archetypes(Matcher(Position))
+        assert archetype.entities == entities
+        assert not entities[0].has(Person)
+        assert [entity.get(Position) for entity in entities] == [
+            Position(0, 0), Position(1, 10), Position(2, 20)]
+        assert all([len(column) == 3
+                    for column in archetype.columns[Position]])
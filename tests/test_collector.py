@@ -0,0 +1,32 @@
+from entitas import Context, Matcher, Collector, GroupEvent
+from .test_components import Movable, Position
+
+
+def test_collector():
+    context = Context()
+    entity = context.create_entity()
+    group = context.get_group(Matcher(Position))
+    added = Collector()
+    added.add(group, GroupEvent.ADDED)
+    added.activate()
+    removed = Collector()
+    removed.add(group, GroupEvent.REMOVED)
+    removed.activate()
+
+    entity.add(Movable)
+    assert not added.collected_entities
+
+    entity.add(Position, 1, 2)
+    assert added.collected_entities == set([entity])
+    added.clear_collected_entities()
+
+    entity.replace(Position, 3, 4)
+    assert added.collected_entities == set([entity])
+    assert not removed.collected_entities
+
+    entity.remove(Position)
+    assert removed.collected_entities == set([entity])
+
+    added.deactivate()
+    entity.add(Position, 1, 2)
+    assert not added.collected_entities
@@ -0,0 +1,86 @@
+import pytest
+from entitas import Context, Matcher, ArchetypeStorage
+from .test_components import Movable, Position
+
+
+def make_context(storage=None):
+    context = Context(storage)
+    for i in range(3):
+        entity = context.create_entity()
+        entity.add(Position, i, i * 10)
+        entity.add(Movable)
+    return context
+
+
+@pytest.mark.parametrize('storage', [None, ArchetypeStorage({Position: 'd'})])
+def test_write_back(storage):
+    context = make_context(storage)
+    group = context.get_group(Matcher(Position))
+    updated = []
+    group.on_entity_updated += lambda e, old, new: updated.append(new)
+
+    columns = group.columns(Position, Movable)
+    assert len(columns) == 3
+    assert columns[Movable].__dict__ == {}
+
+    position = columns[Position]
+    position.x = [x + 1 for x in position.x]
+    context.write_back(columns, Position)
+
+    for entity in columns.entities:
+        assert entity.get(Position).x == entity.get(Position).y / 10 + 1
+    assert len(updated) == 3
+
+    context.write_back(columns)
+    assert len(updated) == 3
+
+
+def test_numpy_columns():
+    numpy = pytest.importorskip('numpy')
+    context = make_context()
+    group = context.get_group(Matcher(Position))
+
+    columns = group.columns(Position)
+    position = columns[Position]
+    assert isinstance(position.x, numpy.ndarray)
+
+    position.x += 1
+    context.write_back(columns)
+    for entity in group.entities:
+        assert isinstance(entity.get(Position).x, int)
+        assert entity.get(Position).x == entity.get(Position).y / 10 + 1
+
+
+def test_write_back_archetypes():
+    storage = ArchetypeStorage({Position: 'd'})
+    context = make_context(storage)
+    group = context.get_group(Matcher(Position))
+    entities = group.get_entities_snapshot()
+
+    columns = group.columns(Position)
+    columns[Position].y = [0] * 3
+    context.write_back(columns)
+    archetype, = storage.get_archetypes(Matcher(Position))
+    assert list(archetype.columns[Position][1]) == [0, 0, 0]
+
+    entities[0].remove(Movable)
+    columns = group.columns(Position)
+    columns[Position].y = [1] * 3
+    context.write_back(columns)
+    assert [entity.get(Position).y for entity in entities] == [1, 1, 1]
+
+
+def test_write_back_rejected_values():
+    context = make_context(ArchetypeStorage({Position: 'q'}))
+    group = context.get_group(Matcher(Position))
+    entities = group.get_entities_snapshot()
+    updated = []
+    group.on_entity_updated += lambda e, old, new: updated.append(new)
+
+    columns = group.columns(Position)
+    columns[Position].x = [5, 6, 'bad']
+    with pytest.raises(TypeError):
+        context.write_back(columns)
+
+    assert [entity.get(Position).x for entity in entities] == [0, 1, 2]
+    assert updated == []
@@ -0,0 +1,114 @@
+import pytest
+from entitas import (
+    Context, Matcher, Processors, InitializeProcessor, ExecuteProcessor)
+from entitas.exceptions import EntityNotEnabled
+from .test_components import Movable, Position
+
+
+class Spawn(InitializeProcessor):
+
+    def __init__(self, context):
+        self._context = context
+
+    def initialize(self):
+        self._context.create_entity().add(Position, 0, 0)
+
+
+class Move(ExecuteProcessor):
+
+    def __init__(self, context, command_buffer):
+        self._group = context.get_group(Matcher(Position))
+        self._command_buffer = command_buffer
+
+    def execute(self):
+        for entity in self._group.entities:
+            x, y = entity.get(Position)
+            self._command_buffer.replace(entity, Position, x + 1, y)
+            self._command_buffer.replace(entity, Position, x + 2, y)
+            if x > 0:
+                self._command_buffer.destroy_entity(entity)
+
+
+def test_coalesced_changes():
+    context = Context()
+    command_buffer = context.create_command_buffer()
+    entity = context.create_entity()
+    group = context.get_group(Matcher(Position))
+    updated = []
+    group.on_entity_updated += lambda e, old, new: updated.append(new)
+
+    command_buffer.add(entity, Movable)
+    command_buffer.remove(entity, Movable)
+    command_buffer.add(entity, Position, 1, 2)
+    command_buffer.replace(entity, Position, 3, 4)
+    assert len(command_buffer) == 1
+    assert not entity.has(Position)
+
+    command_buffer.flush()
+    assert entity.get(Position) == Position(3, 4)
+    assert not entity.has(Movable)
+    assert len(command_buffer) == 0
+
+    command_buffer.replace(entity, Position, 5, 6)
+    command_buffer.replace(entity, Position, 7, 8)
+    command_buffer.flush()
+    assert updated == [Position(7, 8)]
+
+    command_buffer.remove(entity, Position)
+    command_buffer.add(entity, Position, 9, 9)
+    command_buffer.flush()
+    assert updated[-1] == Position(9, 9)
+
+
+def test_failed_flush():
+    context = Context()
+    command_buffer = context.create_command_buffer()
+    removed, entity, destroyed = [context.create_entity() for _ in range(3)]
+    entity.add(Position, 0, 0)
+
+    command_buffer.add(removed, Movable)
+    command_buffer.replace(entity, Position, 1, 2)
+    command_buffer.add(entity, Movable)
+    command_buffer.destroy_entity(destroyed)
+    context.destroy_entity(removed)
+
+    with pytest.raises(EntityNotEnabled):
+        command_buffer.flush()
+    assert len(command_buffer) == 3
+    assert entity.get(Position) == Position(0, 0)
+
+    command_buffer.flush()
+    assert entity.get(Position) == Position(1, 2)
+    assert entity.has(Movable)
+    assert not context.has_entity(destroyed)
+    assert len(command_buffer) == 0
+
+    gone, alive = context.create_entity(), context.create_entity()
+    command_buffer.destroy_entity(gone)
+    command_buffer.destroy_entity(alive)
+    context.destroy_entity(gone)
+    reused = context.create_entity()
+    assert reused is gone
+
+    command_buffer.flush()
+    assert not context.has_entity(alive)
+    assert context.has_entity(reused)
+    assert len(command_buffer) == 0
+
+
+def test_processors_flush():
+    context = Context()
+    command_buffer = context.create_command_buffer()
+
+    processors = Processors()
+    processors.add(Spawn(context))
+    processors.add(Move(context, command_buffer))
+    processors.add_command_buffer(command_buffer)
+
+    processors.initialize()
+    entity = context.get_group(Matcher(Position)).single_entity
+    processors.execute()
+    assert entity.get(Position) == Position(2, 0)
+
+    processors.execute()
+    assert not context.has_entity(entity)
@@ -0,0 +1,126 @@
+import pickle
+
+import pytest
+from entitas import (
+    Context, Matcher, GroupEvent, EntityIndex, ArchetypeStorage,
+    ChangeCollector, ChangeJournal, mutable_component
+)
+from .test_components import Position
+
+Velocity = mutable_component('Velocity', 'dx dy')
+
+
+def test_mutable_component():
+    velocity = Velocity(1, dy=2)
+    assert (velocity.dx, velocity.dy) == (1, 2)
+    assert tuple(velocity) == (1, 2) and velocity[1] == 2
+    assert velocity == Velocity._make([1, 2])
+    assert velocity._replace(dx=3) == Velocity(3, 2)
+    assert velocity._asdict() == {'dx': 1, 'dy': 2}
+    assert repr(velocity) == 'Velocity(dx=1, dy=2)'
+    assert pickle.loads(pickle.dumps(velocity)) == velocity
+
+    with pytest.raises(TypeError):
+        Velocity._make([1])
+    with pytest.raises(AttributeError):
+        velocity.z = 0
+
+
+def test_update_in_place():
+    context = Context()
+    group = context.get_group(Matcher(Velocity))
+    index = EntityIndex(Velocity, group, 'dx')
+    updates = []
+    group.on_entity_updated += lambda e, old, new: updates.append(
+        (old._copy(), new._copy()))
+
+    entity = context.create_entity()
+    entity.add(Velocity, 1, 2)
+    velocity = entity.get(Velocity)
+    entity.update(Velocity, dx=5)
+
+    assert entity.get(Velocity) is velocity
+    assert velocity == Velocity(5, 2)
+    assert updates == [(Velocity(1, 2), Velocity(5, 2))]
+    assert index.get_entities(5) == {entity}
+    assert not index.get_entities(1)
+
+    with pytest.raises(ValueError):
+        entity.update(Velocity, z=0)
+
+    entity.add(Position, 1, 2)
+    entity.update(Position, y=3)
+    assert entity.get(Position) == Position(1, 3)
+
+
+def test_component_pool():
+    Pooled = mutable_component('Pooled', 'value', pool_size=1)
+    entity = Context().create_entity()
+    entity.add(Pooled, 1)
+    comp = entity.get(Pooled)
+
+    entity.remove(Pooled)
+    assert Pooled._pool == [comp]
+    entity.add(Pooled, 2)
+    assert entity.get(Pooled) is comp
+    entity.replace(Pooled, 3)
+    assert entity.get(Pooled) is not comp and Pooled._pool == [comp]
+
+
+def test_archetype_update():
+    context = Context(ArchetypeStorage())
+    entity = context.create_entity()
+    entity.add(Velocity, 1, 2)
+    entity.update(Velocity, dy=4)
+    assert entity.get(Velocity) == Velocity(1, 4)
+
+
+def test_create_entities():
+    context = Context()
+    entities = context.create_entities(3, [(Velocity, 1, 2), (Position, 0, 0)])
+    entities[0].update(Velocity, dx=5)
+
+    assert [entity.get(Velocity) for entity in entities] == [
+        Velocity(5, 2), Velocity(1, 2), Velocity(1, 2)]
+    assert len(set([id(entity.get(Velocity)) for entity in entities])) == 3
+    assert entities[1].get(Position) is entities[0].get(Position)
+
+
+def test_kept_by_listeners():
+    context = Context()
+    group = context.get_group(Matcher(Velocity))
+    collector = ChangeCollector()
+    collector.add(group, GroupEvent.ADDED)
+    collector.activate()
+    journal = ChangeJournal(context)
+    reader = journal.create_reader()
+
+    entity = context.create_entity()
+    entity.add(Velocity, 1, 2)
+    collector.clear_collected_entities()
+    entity.update(Velocity, dx=5)
+    entity.update(Velocity, dx=7)
+    context.create_entity().add(Velocity, 0, 0)
+
+    assert collector.changes[group.matcher][entity][Velocity] == [
+        Velocity(1, 2), Velocity(7, 2)]
+    assert [record[2] for record in reader.read()[1:4]] == [
+        Velocity(1, 2), Velocity(5, 2), Velocity(7, 2)]
+
+
+def test_write_back():
+    context = Context()
+    group = context.get_group(Matcher(Velocity))
+    entities = context.create_entities(3, [(Velocity, 1, 2)])
+    updated = []
+    group.on_entity_updated += lambda e, old, new: updated.append(e)
+
+    columns = group.columns(Velocity)
+    context.write_back(columns)
+    assert updated == []
+
+    columns[Velocity].dx = [3] * 3
+    context.write_back(columns)
+    assert len(updated) == 3
+    assert all([entity.get(Velocity) == Velocity(3, 2)
+                for entity in entities])
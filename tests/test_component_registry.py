@@ -0,0 +1,16 @@
+from entitas.component_registry import get_bit, get_mask
+from .test_components import Movable, Position, Person
+
+
+def test_bits():
+    bits = [get_bit(Movable), get_bit(Position), get_bit(Person)]
+    assert len(set(bits)) == 3
+    assert all(bin(bit).count('1') == 1 for bit in bits)
+    assert get_bit(Position) == bits[1]
+
+
+def test_mask():
+    mask = get_mask((Movable, Person))
+    assert mask == get_bit(Movable) | get_bit(Person)
+    assert not mask & get_bit(Position)
+    assert get_mask(()) == 0
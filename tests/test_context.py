@@ -1,5 +1,11 @@
+import gc
+
 import pytest
-from entitas import Context, Entity, MissingEntity
+from entitas import (
+    Context, Entity, Matcher, EntityIndex, AlreadyAddedComponent,
+    MissingEntity
+)
+from .test_components import Movable, Position, Person
 
 _context = Context()
 _entity = _context.create_entity()
@@ -29,3 +35,204 @@ class TestContext(object):
 
         with pytest.raises(MissingEntity):
             _context.destroy_entity(_entity)
+
+    def test_group_routing(self):
+        context = Context()
+        entity = context.create_entity()
+        movables = context.get_group(Matcher(Movable))
+        static = context.get_group(
+            Matcher(all_of=[Position], none_of=[Movable]))
+
+        calls = []
+        movables.on_entity_added += lambda e, c: calls.append(c)
+
+        entity.add(Position, 1, 2)
+        assert static.entities == set([entity])
+        assert movables.entities == set()
+        assert calls == []
+
+        entity.add(Movable)
+        assert static.entities == set()
+        assert movables.entities == set([entity])
+        assert calls == [Movable()]
+
+    def test_get_group_cache(self):
+        context = Context()
+        context.create_entity().add(Position, 1, 2)
+
+        group = context.get_group(Matcher(Position, Movable))
+        assert context.get_group(Matcher(Movable, Position)) is group
+        assert len(context._groups) == 1
+
+        for _ in range(3):
+            assert context.get_unique_component(Position) == Position(1, 2)
+        assert len(context._groups) == 2
+
+    def test_create_entities(self):
+        context = Context()
+        context.destroy_entity(context.create_entity())
+        group = context.get_group(Matcher(Position))
+        index = EntityIndex(Person, context.get_group(Matcher(Person)), 'age')
+        added = []
+        group.on_entity_added += lambda e, c: added.append(c)
+
+        entities = context.create_entities(
+            3, components=[(Position, 1, 2), (Person, 'Max', 7)])
+
+        assert len(entities) == 3 and len(context.entities) == 3
+        assert len(set(e._creation_index for e in entities)) == 3
+        assert group.entities == set(entities)
+        assert index.get_entities(7) == set(entities)
+        assert added == [Position(1, 2)] * 3
+        assert entities[0].get(Person) == Person('Max', 7)
+        assert context.create_entities(0, [(Position, 1, 2)]) == []
+        assert len(context.entities) == 3
+
+        with pytest.raises(AlreadyAddedComponent):
+            context.create_entities(1, [(Movable,), (Movable,)])
+
+    def test_destroy_entities(self):
+        context = Context()
+        group = context.get_group(Matcher(all_of=[Position],
+                                          none_of=[Movable]))
+        index = EntityIndex(Person, context.get_group(Matcher(Person)), 'age')
+        entities = context.create_entities(
+            2, [(Position, 1, 2), (Person, 'Max', 7)])
+        kept = context.create_entity()
+        kept.add(Position, 3, 4)
+        removed = []
+        group.on_entity_removed += lambda e, c: removed.append(c)
+
+        with pytest.raises(MissingEntity):
+            context.destroy_entities(entities + [Context().create_entity()])
+        assert len(context.entities) == 3
+
+        context.destroy_entities(entities)
+        assert context.entities == set([kept])
+        assert group.entities == set([kept])
+        assert index.get_entities(7) == set()
+        assert removed == [Position(1, 2)] * 2
+        assert not entities[0].has(Position)
+
+        assert set(context.create_entities(2)) == set(entities)
+
+    def test_entity_listeners(self):
+        context = Context()
+        group = context.get_group(Matcher(Position))
+        entity = context.create_entity()
+        events = []
+        entity.on_component_added += lambda e, c: events.append(
+            ('added', c, e in group.entities))
+        entity.on_component_removed += lambda e, c: events.append(
+            ('removed', c))
+
+        entity.add(Position, 1, 2)
+        context.destroy_entities([entity])
+        assert context.create_entities(1, [(Position, 3, 4)]) == [entity]
+        assert events == [('added', Position(1, 2), True),
+                          ('removed', Position(1, 2)),
+                          ('added', Position(3, 4), True)]
+
+    def test_unconstrained_groups(self):
+        context = Context()
+        excluding = context.get_group(Matcher(none_of=[Movable]))
+        every = context.get_group(Matcher())
+        updated = []
+        every.on_entity_updated += lambda e, old, new: updated.append(new)
+
+        entity = context.create_entity()
+        entity.add(Person, 'Max', 7)
+        assert excluding.entities == {entity}
+        assert every.entities == {entity}
+
+        entity.replace(Person, 'Max', 8)
+        assert updated == [Person('Max', 8)]
+
+        entity.add(Movable)
+        assert excluding.entities == set()
+        assert every.entities == {entity}
+
+        entities = context.create_entities(2, [(Position, 1, 2)])
+        assert excluding.entities == set(entities)
+        context.destroy_entities(entities)
+        assert every.entities == {entity}
+
+    def test_lazy_groups(self):
+        context = Context()
+        entity = context.create_entity()
+        entity.add(Position, 1, 2)
+
+        group = context.get_group(Matcher(Position), lazy=True)
+        assert not group.is_materialized
+        assert Position not in context._groups_for_type
+
+        assert group.entities == {entity}
+        assert group.is_materialized
+        other = context.create_entity()
+        other.add(Position, 3, 4)
+        assert group.entities == {entity, other}
+
+    def test_demote_idle_groups(self):
+        context = Context()
+        entity = context.create_entity()
+        query = context.get_group(Matcher(Position))
+        listened = context.get_group(Matcher(Movable))
+        listened.on_entity_added += lambda e, c: None
+
+        query.entities
+        assert context.demote_idle_groups(max_idle_count=2) == 0
+        assert context.demote_idle_groups(max_idle_count=2) == 0
+        assert context.demote_idle_groups(max_idle_count=2) == 1
+        assert not query.is_materialized
+        assert listened.is_materialized
+        assert context._groups_for_type[Position] == []
+
+        entity.add(Position, 1, 2)
+        assert query.entities == {entity}
+        assert context.get_group(Matcher(Position)) is query
+
+        other = context.create_entity()
+        other.add(Position, 0, 0)
+        assert context.demote_idle_groups(evict=True) == 0
+        context.destroy_entities([other])
+        assert context.demote_idle_groups(evict=True) == 1
+        assert Matcher(Position) not in context._groups
+        assert context.get_group(Matcher(Movable)) is listened
+
+        assert query.entities == {entity}
+        entity.replace(Position, 3, 4)
+        assert context.get_group(Matcher(Position)) is query
+        assert context._groups_for_type[Position] == [query]
+
+        assert context.demote_idle_groups(evict=True) == 0
+        assert context.demote_idle_groups(evict=True) == 1
+        del query
+        gc.collect()
+        group = context.get_group(Matcher(Position))
+        assert group.entities == {entity}
+        assert context._groups_for_type[Position] == [group]
+
+        lazy = context.get_group(Matcher(Person), lazy=True)
+        assert context.demote_idle_groups(max_idle_count=2, evict=True) == 0
+        assert context.get_group(Matcher(Person), lazy=True) is lazy
+        context.demote_idle_groups(max_idle_count=2, evict=True)
+        assert Matcher(Person) not in context._groups
+        entity.add(Person, 'Max', 7)
+        assert lazy.entities == {entity}
+        assert context.get_group(Matcher(Person)) is lazy
+
+    def test_resolve(self):
+        context = Context()
+        entities = context.create_entities(3)
+        handles = [entity.handle for entity in entities]
+        assert [context.resolve(handle) for handle in handles] == entities
+        assert len(set(handles)) == 3
+
+        context.destroy_entities(entities[:2])
+        assert context.resolve(handles[0]) is None
+        assert context.resolve(handles[2]) is entities[2]
+        assert context.resolve(1 << 40 | 1000) is None
+
+        entity = context.create_entity()
+        assert context.resolve(entity.handle) is entity
+        assert entity.handle not in handles
@@ -53,3 +53,15 @@ class TestEntity(object):
     def test_destroy(self):
         _entity.destroy()
         assert not _entity.has(Movable, Position)
+
+    def test_lazy_events(self):
+        entity = Entity()
+        entity.activate(0)
+        assert not hasattr(entity, '__dict__')
+        assert entity._on_component_added is None
+
+        added = []
+        entity.on_component_added += lambda e, c: added.append(c)
+        entity.add(Position, 1, 2)
+        assert added == [Position(1, 2)]
+        assert entity._on_component_removed is None
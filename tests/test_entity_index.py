@@ -1,8 +1,9 @@
 import pytest
 from entitas import (
-    Context, Matcher, PrimaryEntityIndex, EntityIndex, EntitasException
+    Context, Matcher, PrimaryEntityIndex, EntityIndex, RangeEntityIndex,
+    SpatialEntityIndex, KDTreeEntityIndex, EntitasException
 )
-from .test_components import Person
+from .test_components import Person, Position
 
 
 class TestEntityIndex(object):
@@ -43,3 +44,142 @@ class TestEntityIndex(object):
 
         with pytest.raises(EntitasException):
             eve.add(Person, 'Eve', 42)
+
+    def test_replace(self):
+        context = Context()
+        group = context.get_group(Matcher(Person))
+        index = EntityIndex(Person, group, 'age')
+        adam = context.create_entity()
+        adam.add(Person, 'Adam', 42)
+
+        calls = []
+        remove_entity = index._remove_entity
+        index._remove_entity = lambda *args: (calls.append(args),
+                                              remove_entity(*args))
+
+        adam.replace(Person, 'Adam Jr.', 42)
+        assert calls == []
+        assert index.get_entities(42) == set([adam])
+
+        adam.replace(Person, 'Adam Jr.', 43)
+        assert calls == [(42, adam)]
+        assert index.get_entities(43) == set([adam])
+
+    def test_primary_index_swap(self):
+        context = Context()
+        group = context.get_group(Matcher(Person))
+        index = PrimaryEntityIndex(Person, group, 'name', 'age')
+        adam = context.create_entity()
+        adam.add(Person, 'Adam', 'Eve')
+
+        adam.replace(Person, 'Eve', 'Adam')
+        assert index.get_entity('Eve') == adam
+        assert index.get_entity('Adam') == adam
+
+    def test_range_index(self):
+        context = Context()
+        group = context.get_group(Matcher(Person))
+        index = RangeEntityIndex(Person, group, 'age')
+        people = {}
+        for name, age in [('Max', 30), ('Adam', 42), ('Eve', 20),
+                          ('Abel', 5), ('Cain', 42)]:
+            people[name] = context.create_entity()
+            people[name].add(Person, name, age)
+
+        def names(entities):
+            return [entity.get(Person).name for entity in entities]
+
+        assert names(index.range(20, 42)) == ['Eve', 'Max']
+        assert names(index.range(high=20)) == ['Abel']
+        assert set(names(index.range(42))) == set(['Adam', 'Cain'])
+        assert names([index.min()]) == ['Abel']
+        assert names(index.smallest(2)) == ['Abel', 'Eve']
+        assert names(index.largest(3))[2] == 'Max'
+
+        people['Abel'].replace(Person, 'Abel', 50)
+        context.destroy_entity(people['Cain'])
+        assert names(index.smallest(2)) == ['Eve', 'Max']
+        assert names([index.max()]) == ['Abel']
+        assert len(index) == 4
+
+    @pytest.mark.parametrize('index_class, kwargs', [
+        (SpatialEntityIndex, {'cell_size': 2}),
+        (KDTreeEntityIndex, {}),
+    ])
+    def test_spatial_index(self, index_class, kwargs):
+        context = Context()
+        group = context.get_group(Matcher(Position))
+        index = index_class(Position, group, 'x', 'y', **kwargs)
+        entities = {}
+        for x in range(-5, 6):
+            for y in range(-5, 6):
+                entities[x, y] = context.create_entity()
+                entities[x, y].add(Position, x, y)
+
+        def positions(result):
+            return set([tuple(entity.get(Position)) for entity in result])
+
+        assert positions(index.query_box((0, 0), (1, 2))) == set([
+            (0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)])
+        assert positions(index.query_radius((0, 0), 1)) == set([
+            (0, 0), (1, 0), (-1, 0), (0, 1), (0, -1)])
+        assert len(index.query_box((-100, -100), (100, 100))) == 121
+
+        entities[0, 0].replace(Position, 0.5, 0.5)
+        context.destroy_entity(entities[1, 0])
+        assert positions(index.query_radius((0, 0), 1)) == set([
+            (0.5, 0.5), (-1, 0), (0, 1), (0, -1)])
+        assert index.query_box((20, 20), (30, 30)) == []
+
+    def test_composite_and_key_indices(self):
+        context = Context()
+        group = context.get_group(Matcher(Position))
+        context.add_entity_index(EntityIndex(Position, group, 'x', 'y',
+                                             composite=True))
+
+        def chunk(position):
+            return (position.x // 10, position.y // 10)
+
+        context.add_entity_index(PrimaryEntityIndex(Position, group,
+                                                    key=chunk))
+        entity = context.create_entity()
+        entity.add(Position, 12, 34)
+
+        with pytest.raises(EntitasException):
+            context.get_entity_index(Position)
+        assert len(context.get_entity_indices(Position)) == 2
+
+        index = context.get_entity_index(Position, 'x,y')
+        assert index.get_entities((12, 34)) == set([entity])
+        assert index.get_entities(12) == set()
+        chunks = context.get_entity_index(Position, 'chunk')
+        assert chunks.get_entity((1, 3)) == entity
+
+        entity.replace(Position, 15, 36)
+        assert chunks.get_entity((1, 3)) == entity
+        assert index.get_entities((15, 36)) == set([entity])
+
+        entity.replace(Position, 25, 36)
+        assert chunks.get_entity((2, 3)) == entity
+
+    def test_handle_indices(self):
+        context = Context()
+        group = context.get_group(Matcher(Person))
+        index = EntityIndex(Person, group, 'age', handles=True)
+        primary = PrimaryEntityIndex(Person, group, 'name', handles=True)
+
+        entity = context.create_entity()
+        entity.add(Person, 'Max', 42)
+        handle = entity.handle
+        assert index.get_entities(42) == {handle}
+        assert primary.get_entity('Max') == handle
+        assert context.resolve(handle) is entity
+
+        context.destroy_entity(entity)
+        assert index.get_entities(42) == set()
+        assert context.resolve(handle) is None
+
+        reused = context.create_entity()
+        assert reused is entity and reused.handle != handle
+        assert context.resolve(handle) is None
+        assert context.resolve(reused.handle) is reused
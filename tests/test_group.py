@@ -1,5 +1,6 @@
-from entitas import Context, Matcher
-from .test_components import Movable
+import pytest
+from entitas import Context, Matcher, GroupSingleEntity
+from .test_components import Movable, Position
 
 _context = Context()
 _entity = _context.create_entity()
@@ -21,3 +22,70 @@ class TestGroup(object):
         assert _group.single_entity == _entity
         _entity.remove(Movable)
         assert not _group.single_entity
+
+    def test_replace_aware_events(self):
+        context = Context()
+        entity = context.create_entity()
+        group = context.get_group(Matcher(Position))
+        events = []
+        group.on_entity_joined += lambda e, c: events.append(('joined', c))
+        group.on_entity_left += lambda e, c: events.append(('left', c))
+        group.on_entity_updated += (
+            lambda e, old, new: events.append(('updated', old, new)))
+
+        entity.add(Position, 1, 2)
+        entity.replace(Position, 3, 4)
+        entity.remove(Position)
+        assert events == [('joined', Position(1, 2)),
+                          ('updated', Position(1, 2), Position(3, 4)),
+                          ('left', Position(3, 4))]
+
+    def test_cursors(self):
+        context = Context()
+        existing = context.create_entity()
+        existing.add(Position, 0, 0)
+        group = context.get_group(Matcher(Position))
+        first = group.create_cursor(include_existing=True)
+        second = group.create_cursor()
+
+        entity = context.create_entity()
+        entity.add(Position, 1, 2)
+        existing.replace(Position, 3, 4)
+        assert first.read() == ({existing, entity}, set(), set())
+
+        entity.replace(Position, 5, 6)
+        existing.remove(Position)
+        transient = context.create_entity()
+        transient.add(Position, 0, 0)
+        transient.remove(Position)
+        assert second.read() == ({entity}, {existing}, set())
+        assert first.read() == (set(), {existing}, {entity})
+        assert first.read() == (set(), set(), set())
+        assert group._log == []
+
+        existing.add(Position, 0, 0)
+        second.close()
+        assert len(group._log) == 1
+        first.close()
+        assert group._log == []
+        assert group._log_joined not in group.on_entity_joined
+
+    def test_entities_snapshot(self):
+        context = Context()
+        group = context.get_group(Matcher(Position))
+        entities = [context.create_entity() for _ in range(5)]
+        for entity in reversed(entities):
+            entity.add(Position, 0, 0)
+
+        snapshot = group.get_entities_snapshot()
+        assert snapshot == tuple(entities)
+        for entity in snapshot:
+            entity.replace(Position, 1, 1)
+        assert group.get_entities_snapshot() is snapshot
+
+        for entity in snapshot[:2]:
+            context.destroy_entity(entity)
+        assert group.get_entities_snapshot() == tuple(entities[2:])
+
+        with pytest.raises(GroupSingleEntity):
+            group.single_entity
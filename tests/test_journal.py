@@ -0,0 +1,79 @@
+import asyncio
+import io
+
+import pytest
+from entitas import (
+    Context, ChangeJournal, write_frame, read_frames, replay,
+    EntitasException
+)
+from .test_components import Movable, Position, Person
+
+
+def get_state(context):
+    return {entity.creation_index: set(entity.get_components())
+            for entity in context.entities}
+
+
+def test_journal_replay():
+    context = Context()
+    existing = context.create_entity()
+    existing.add(Person, 'Ann', 3)
+
+    journal = ChangeJournal(context, include_existing=True)
+    reader = journal.create_reader(from_start=True)
+    file = io.BytesIO()
+
+    entity = context.create_entity()
+    entity.add(Position, 1, 2)
+    entity.add(Movable)
+    write_frame(file, reader.read())
+
+    entity.replace(Position, 3, 4)
+    entity.remove(Movable)
+    context.destroy_entity(existing)
+    context.create_entities(3, [(Position, 0, 0)])
+    write_frame(file, reader.read(max_count=2))
+    write_frame(file, reader.read())
+    assert reader.read() == []
+
+    file.seek(0)
+    replica = Context()
+    entities = {}
+    for records in read_frames(file):
+        replay(replica, records, entities)
+    assert get_state(replica) == get_state(context)
+
+
+def test_journal_overrun():
+    context = Context()
+    journal = ChangeJournal(context, capacity=4)
+    reader = journal.create_reader()
+
+    entity = context.create_entity()
+    for i in range(3):
+        entity.add(Position, i, i)
+        entity.remove(Position)
+
+    assert len(journal) == 4
+    with pytest.raises(EntitasException):
+        reader.read()
+
+
+def test_journal_stream():
+    context = Context()
+    journal = ChangeJournal(context)
+    reader = journal.create_reader()
+
+    async def consume():
+        return [records async for records in reader.stream(max_count=2)]
+
+    async def produce():
+        task = asyncio.ensure_future(consume())
+        context.create_entity().add(Movable)
+        await asyncio.sleep(0.05)
+        context.create_entity()
+        journal.close()
+        return await task
+
+    batches = asyncio.run(produce())
+    assert [len(records) for records in batches] == [2, 1]
@@ -36,3 +36,27 @@ def test_matches():
     assert matcher.matches(ea)
     assert not matcher.matches(eb)
     assert not matcher.matches(ec)
+
+
+def test_equality():
+    matcher = Matcher(all_of=[CompA, CompB], none_of=[CompC])
+
+    assert matcher == Matcher(all_of=[CompB, CompA], none_of=[CompC])
+    assert hash(matcher) == hash(Matcher(all_of=(CompB, CompA),
+                                         none_of=(CompC,)))
+    assert Matcher(CompA, CompB) == Matcher(all_of=[CompA, CompB])
+    assert matcher != Matcher(all_of=[CompA, CompB], any_of=[CompC])
+
+
+def test_matches_signature():
+    entity = Entity()
+    entity.activate(0)
+    entity.add(CompA)
+    entity.add(CompD)
+    matcher = Matcher(all_of=[CompA], any_of=[CompD, CompE])
+
+    assert matcher.matches_signature(entity._signature)
+    entity.remove(CompD)
+    assert not matcher.matches_signature(entity._signature)
+    assert not Matcher(none_of=[CompA]).matches(entity)
+    assert Matcher().matches(entity)
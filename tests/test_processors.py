@@ -0,0 +1,243 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from entitas import (
+    Context, Matcher, GroupEvent, Processors, ExecuteProcessor,
+    BatchReactiveProcessor, Change, EntitasException
+)
+from .test_components import Movable, Position, Person
+
+
+class Processor(ExecuteProcessor):
+
+    def __init__(self, context, processors, comp_type, source=None,
+                 command_buffer=None):
+        self._group = context.get_group(Matcher(comp_type))
+        if command_buffer is None:
+            command_buffer = context.create_command_buffer()
+            processors.add_command_buffer(command_buffer)
+        self._command_buffer = command_buffer
+        self._comp_type = comp_type
+        self._source = source
+        self.reads = (comp_type, source) if source else (comp_type,)
+        self.writes = (comp_type,)
+
+    def execute(self):
+        for entity in self._group.entities:
+            value = entity.get(self._comp_type)[1] + 1
+            if self._source and entity.has(self._source):
+                value += entity.get(self._source)[1]
+            self._command_buffer.replace(
+                entity, self._comp_type, entity.get(self._comp_type)[0],
+                value)
+
+
+class Undeclared(ExecuteProcessor):
+
+    def execute(self):
+        pass
+
+
+def test_stages():
+    context = Context()
+    processors = Processors()
+    positions = Processor(context, processors, Position)
+    persons = Processor(context, processors, Person, Position)
+    undeclared = Undeclared()
+    movables = Processor(context, processors, Movable)
+    for processor in [positions, persons, undeclared, movables]:
+        processors.add(processor)
+
+    assert processors.stages == [[positions], [persons], [undeclared],
+                                 [movables]]
+
+    processors = Processors()
+    for processor in [persons, movables, positions]:
+        processors.add(processor)
+    assert processors.stages == [[persons, movables], [positions]]
+
+
+def run(executor, sequential=False):
+    context = Context()
+    processors = Processors(executor)
+    for i in range(100):
+        entity = context.create_entity()
+        entity.add(Position, i, i)
+        if i % 2:
+            entity.add(Person, 'Person {}'.format(i), i)
+
+    persons = Processor(context, processors, Person)
+    for processor in [Processor(context, processors, Position), persons,
+                      Processor(context, processors, Person, Position,
+                                persons._command_buffer)]:
+        if sequential:
+            processor.reads = processor.writes = None
+        processors.add(processor)
+    stage_sizes = [1, 1, 1] if sequential else [2, 1]
+    assert [len(stage) for stage in processors.stages] == stage_sizes
+
+    updated = []
+    group = context.get_group(Matcher(Person))
+    group.on_entity_updated += lambda e, old, new: updated.append(new)
+
+    for _ in range(3):
+        processors.execute()
+
+    return sorted([tuple(entity.get_components()) for entity
+                   in context.entities], key=repr), len(updated)
+
+
+def test_parallel_matches_serial():
+    expected = run(None, sequential=True)
+    assert expected[1] == 50 * 3
+    assert run(None) == expected
+
+    with ThreadPoolExecutor(4) as executor:
+        assert run(executor) == expected
+
+
+class Shared(ExecuteProcessor):
+
+    reads = ()
+    writes = ()
+
+    def __init__(self, command_buffer, entity):
+        self._command_buffer = command_buffer
+        self._entity = entity
+
+    def execute(self):
+        self._command_buffer.replace(self._entity, Position, 0, 0)
+
+
+def test_shared_command_buffer():
+    context = Context()
+    entity = context.create_entity()
+    command_buffer = context.create_command_buffer()
+
+    with ThreadPoolExecutor(2) as executor:
+        processors = Processors(executor)
+        processors.add(Shared(command_buffer, entity))
+        processors.add(Shared(command_buffer, entity))
+        processors.add_command_buffer(command_buffer)
+
+        with pytest.raises(EntitasException):
+            processors.execute()
+
+    processors = Processors()
+    processors.add(Shared(command_buffer, entity))
+    processors.add(Shared(command_buffer, entity))
+    processors.add_command_buffer(command_buffer)
+    processors.execute()
+    assert entity.get(Position) == Position(0, 0)
+
+
+class Reaction(BatchReactiveProcessor):
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.batches = []
+
+    def get_trigger(self):
+        return {Matcher(Position): GroupEvent.ADDED_OR_REMOVED,
+                Matcher(Person): GroupEvent.ADDED}
+
+    def filter_batch(self, entities):
+        return [not entity.has(Movable) for entity in entities]
+
+    def react(self, batches):
+        self.batches.append(batches)
+
+
+def test_batch_reactive_processor():
+    context = Context()
+    processors = Processors()
+    reaction = Reaction(context)
+    processors.add(reaction)
+    processors.activate_reactive_processors()
+
+    entity = context.create_entity()
+    entity.add(Position, 0, 0)
+    entity.replace(Position, 1, 1)
+    entity.add(Person, 'Ann', 3)
+    ignored = context.create_entity()
+    ignored.add(Position, 0, 0)
+    ignored.add(Movable)
+    processors.execute()
+
+    assert reaction.batches == [{
+        Matcher(Position): [Change(entity, None, Position(1, 1))],
+        Matcher(Person): [Change(entity, None, Person('Ann', 3))],
+    }]
+
+    entity.replace(Position, 2, 2)
+    entity.replace(Position, 3, 3)
+    processors.execute()
+    assert reaction.batches[-1] == {
+        Matcher(Position): [Change(entity, Position(1, 1), Position(3, 3))]}
+
+    entity.remove(Position)
+    other = context.create_entity()
+    other.add(Position, 0, 0)
+    other.remove(Position)
+    processors.execute()
+    assert reaction.batches[-1] == {
+        Matcher(Position): [Change(entity, Position(3, 3), None)]}
+
+    processors.deactivate_reactive_processors()
+    entity.add(Position, 0, 0)
+    processors.execute()
+    assert len(reaction.batches) == 3
+
+
+class Pair(BatchReactiveProcessor):
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.batches = []
+
+    def get_trigger(self):
+        return {Matcher(Position, Person): GroupEvent.ADDED_OR_REMOVED}
+
+    def react(self, batches):
+        self.batches.append(batches)
+
+
+def test_batch_changes_by_type():
+    context = Context()
+    processors = Processors()
+    pair = Pair(context)
+    processors.add(pair)
+    processors.activate_reactive_processors()
+    matcher = Matcher(Position, Person)
+
+    entity = context.create_entity()
+    entity.add(Position, 0, 0)
+    entity.add(Person, 'Ann', 1)
+    processors.execute()
+    assert pair.batches[-1] == {
+        matcher: [Change(entity, None, Person('Ann', 1))]}
+
+    entity.replace(Person, 'Ann', 2)
+    entity.replace(Position, 5, 5)
+    entity.replace(Person, 'Ann', 3)
+    processors.execute()
+    assert pair.batches[-1] == {matcher: [
+        Change(entity, Person('Ann', 1), Person('Ann', 3)),
+        Change(entity, Position(0, 0), Position(5, 5))]}
+
+    entity.replace(Person, 'Ann', 4)
+    entity.remove(Position)
+    entity.add(Position, 6, 6)
+    entity.remove(Position)
+    processors.execute()
+    assert pair.batches[-1] == {matcher: [
+        Change(entity, Person('Ann', 3), Person('Ann', 4)),
+        Change(entity, Position(5, 5), None)]}
+
+    other = context.create_entity()
+    other.add(Position, 0, 0)
+    other.add(Person, 'Bob', 1)
+    other.replace(Position, 1, 1)
+    other.remove(Person)
+    processors.execute()
+    assert len(pair.batches) == 3
@@ -0,0 +1,80 @@
+from entitas import (
+    Context, Matcher, GroupEvent, Processors, ExecuteProcessor,
+    ReactiveProcessor, Profiler
+)
+from .test_components import Position
+
+
+class Move(ExecuteProcessor):
+
+    def __init__(self, context):
+        self._group = context.get_group(Matcher(Position))
+
+    def execute(self):
+        for entity in list(self._group.entities):
+            entity.replace(Position, entity.get(Position).x + 1, 0)
+
+
+class Spawn(ReactiveProcessor):
+
+    def __init__(self, context):
+        super().__init__(context)
+        self._context = context
+
+    def get_trigger(self):
+        return {Matcher(Position): GroupEvent.ADDED}
+
+    def filter(self, entity):
+        return True
+
+    def react(self, entities):
+        pass
+
+
+def test_profiler():
+    context = Context()
+    profiler = Profiler()
+    profiler.watch(context)
+
+    processors = Processors()
+    nested = Processors(name='Physics')
+    nested.add(Move(context))
+    processors.add(nested)
+    processors.add(Spawn(context))
+    processors.activate_reactive_processors()
+
+    for i in range(3):
+        context.create_entity().add(Position, i, 0)
+
+    processors.execute()
+    assert profiler.stats == {}
+
+    processors.set_profiler(profiler)
+    processors.execute()
+    processors.execute()
+
+    stats = profiler.as_dict()
+    assert set(stats['processors']) == {
+        'execute;Physics', 'execute;Physics;Move', 'execute;Spawn'}
+    assert stats['processors']['execute;Physics;Move']['count'] == 2
+    assert stats['processors']['execute;Spawn']['p99'] >= 0
+
+    counters = stats['counters']
+    assert counters['entities_created'] == 3
+    assert counters['components_added'] == 3
+    assert counters['components_replaced'] == 9
+    assert counters['group_entities_added'] == 3
+    assert counters['group_entities_updated'] == 9
+    assert 'group_entities_removed' not in counters
+    assert counters['collected_entities'] == 3 + 3
+
+    lines = profiler.to_folded().splitlines()
+    assert [line.split()[0] for line in lines] == [
+        'execute;Physics', 'execute;Physics;Move', 'execute;Spawn']
+
+    processors.set_profiler(None)
+    profiler.unwatch()
+    profiler.reset()
+    processors.execute()
+    context.create_entity()
+    assert profiler.as_dict() == {'processors': {}, 'counters': {}}
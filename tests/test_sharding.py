@@ -0,0 +1,106 @@
+import pytest
+from entitas import Matcher, Processors, ExecuteProcessor, EntitasException
+from .test_components import Movable, Position, Person
+
+pytest.importorskip('multiprocessing.shared_memory')
+from entitas.sharding import ShardedContext  # noqa: E402
+
+
+class Move(ExecuteProcessor):
+
+    def __init__(self, context):
+        self._group = context.get_group(Matcher(Position, Movable))
+
+    def execute(self):
+        for entity in list(self._group.entities):
+            position = entity.get(Position)
+            entity.replace(Position, position.x + 5, position.y)
+
+
+def setup(context):
+    processors = Processors()
+    processors.add(Move(context))
+    return processors
+
+
+def get_cell(comps):
+    return int(comps[Position].x // 10)
+
+
+def test_sharded_context():
+    with ShardedContext(2, get_cell, setup) as context:
+        ids = [context.create_entity(Position(i, 0), Movable())
+               for i in range(20)]
+        still = context.create_entity(Position(0, 1), Person('Ann', 3))
+
+        assert context.get_shard(ids[0]) == 0
+        assert context.get_shard(ids[10]) == 1
+
+        context.execute()
+        assert context.get_shard(ids[5]) == 1
+        assert context.get_shard(ids[0]) == 0
+
+        context.replace(still, Position, 15, 1)
+        context.destroy_entity(ids[1])
+        context.execute()
+
+        entities = context.get_entities()
+        assert len(entities) == len(context) == 20
+        assert set(entities[ids[0]]) == {Position(10, 0), Movable()}
+        assert set(entities[still]) == {Position(15, 1), Person('Ann', 3)}
+        assert context.get_shard(still) == 1
+        assert context.get_shard(ids[0]) == 1
+
+        with pytest.raises(EntitasException):
+            context.remove(ids[1], Position)
+
+        shard = context.get_shard(ids[2])
+        context.remove(ids[2], Position)
+        context.execute()
+        assert context.get_shard(ids[2]) == shard
+
+        context.add(ids[3], Movable)
+        with pytest.raises(EntitasException):
+            context.execute()
+
+
+class Split(ExecuteProcessor):
+
+    def __init__(self, context):
+        self._context = context
+        self._group = context.get_group(Matcher(Person))
+
+    def execute(self):
+        for entity in list(self._group.entities):
+            person = entity.get(Person)
+            if person.age < 0:
+                self._context.destroy_entity(entity)
+            elif person.age > 0:
+                child = self._context.create_entity()
+                child.add(Person, person.name, 0)
+                child.add(Position, 15, 0)
+
+
+def setup_split(context):
+    processors = Processors()
+    processors.add(Split(context))
+    return processors
+
+
+def test_created_and_destroyed_in_shards():
+    with ShardedContext(2, get_cell, setup_split) as context:
+        parent = context.create_entity(Position(0, 0), Person('Ann', 30))
+        context.execute()
+        assert len(context) == 2
+
+        entities = context.get_entities()
+        child, = [global_id for global_id in entities
+                  if global_id != parent]
+        assert set(entities[child]) == {Position(15, 0), Person('Ann', 0)}
+        assert context.get_shard(child) == 1
+
+        context.replace(parent, Person, 'Ann', -1)
+        context.execute()
+        assert len(context) == 1
+        with pytest.raises(EntitasException):
+            context.replace(parent, Position, 1, 1)
@@ -0,0 +1,80 @@
+import pytest
+from entitas import (
+    Context, Matcher, EntityIndex, Snapshot, SnapshotWriter,
+    load_snapshots, EntitasException
+)
+from .test_components import Movable, Position, Person
+
+COMP_TYPES = [Movable, Position, Person]
+
+
+def get_state(context):
+    return {entity.creation_index: set(entity.get_components())
+            for entity in context.entities}
+
+
+def test_full_snapshot(tmpdir):
+    context = Context()
+    for i in range(5):
+        entity = context.create_entity()
+        entity.add(Position, i, i * 0.5)
+        entity.add(Person, 'Person {}'.format(i), i)
+    context.create_entity().add(Movable)
+    context.create_entity()
+
+    path = str(tmpdir.join('full.snap'))
+    SnapshotWriter(context).write(path)
+
+    with Snapshot(path) as snapshot:
+        assert not snapshot.incremental
+        assert sorted(snapshot.entity_ids) == list(range(7))
+        ids, (x, y) = snapshot.get_columns('Position')
+        assert isinstance(x, memoryview) and x.format == 'q'
+        assert y.format == 'd'
+        assert sorted(x.tolist()) == list(range(5))
+        del ids, x, y
+
+    restored = Context()
+    group = restored.get_group(Matcher(Position))
+    index = EntityIndex(Person, restored.get_group(Matcher(Person)), 'age')
+    load_snapshots(restored, [path], COMP_TYPES)
+
+    assert get_state(restored) == get_state(context)
+    assert len(group.entities) == 5
+    assert len(index.get_entities(3)) == 1
+    assert restored.create_entity().creation_index == 7
+
+    with pytest.raises(EntitasException):
+        load_snapshots(restored, [path], COMP_TYPES)
+
+
+def test_incremental_snapshots(tmpdir):
+    context = Context()
+    writer = SnapshotWriter(context)
+    entities = [context.create_entity() for _ in range(4)]
+    for i, entity in enumerate(entities):
+        entity.add(Position, i, i)
+
+    paths = [str(tmpdir.join('{}.snap'.format(i))) for i in range(3)]
+    writer.write(paths[0])
+
+    entities[0].replace(Position, 10, 10)
+    entities[1].add(Movable)
+    context.destroy_entity(entities[2])
+    writer.write(paths[1], incremental=True)
+
+    entities[1].remove(Position)
+    context.create_entity().add(Person, 'Eve', 42)
+    writer.write(paths[2], incremental=True)
+
+    with Snapshot(paths[1]) as snapshot:
+        assert snapshot.incremental
+        assert sorted(snapshot.entity_ids) == [0, 1]
+        assert list(snapshot.destroyed_ids) == [2]
+
+    restored = Context()
+    load_snapshots(restored, paths, COMP_TYPES)
+    assert get_state(restored) == get_state(context)
+
+    with pytest.raises(EntitasException):
+        load_snapshots(Context(), paths, [Position])
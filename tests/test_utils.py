@@ -0,0 +1,51 @@
+from entitas import Event
+
+
+def test_event():
+    calls = []
+    event = Event()
+    event(1)
+
+    def first(value):
+        calls.append(('first', value))
+
+    def second(value):
+        calls.append(('second', value))
+
+    event += first
+    event += first
+    assert len(event) == 1
+    event(1)
+
+    event += second
+    event(2)
+    assert first in event and second in event
+
+    event -= first
+    event -= first
+    event(3)
+    assert calls == [('first', 1), ('first', 2), ('second', 2),
+                     ('second', 3)]
+
+    event(value=4)
+    event += first
+    event(value=5)
+    assert calls[-3:] == [('second', 4), ('second', 5), ('first', 5)]
+
+
+def test_unsubscribe_while_dispatching():
+    calls = []
+    event = Event()
+
+    def once():
+        calls.append('once')
+        event.__sub__(once)
+
+    def always():
+        calls.append('always')
+
+    event += once
+    event += always
+    event()
+    event()
+    assert calls == ['once', 'always', 'always']